@@ -0,0 +1,84 @@
+# autocomplete_service.py
+"""Local city autocomplete, with no network calls.
+
+Keys are kept in sorted lists of (folded key, key) pairs, so the cities
+starting with a prefix are one contiguous slice found with two bisects.
+The user's own cities (history, watchlist) are kept apart and suggested
+before the bundled list.
+"""
+import os
+import unicodedata
+from bisect import bisect_left, insort
+from typing import Iterable, List, Tuple
+
+CITY_LIST_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "cities.txt")
+
+
+def fold(text: str) -> str:
+    """Lowercase and drop accents, so "sao" finds "São Paulo"."""
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch)).lower().strip()
+
+
+class CityIndex:
+    """Prefix index over canonical city keys (e.g. "London,GB")."""
+
+    def __init__(self):
+        self._bundled: List[Tuple[str, str]] = []
+        self._personal: List[Tuple[str, str]] = []
+        self._personal_set = set()  # same pairs, for O(1) duplicate checks
+        self._known = set()  # folded keys in either list
+
+    def load(self, file_path: str = CITY_LIST_FILE) -> int:
+        """Add the bundled city list. Blocking; run off the UI loop.
+        Returns the number of cities added."""
+        try:
+            with open(file_path, "r", encoding="utf-8") as f:
+                lines = [line.strip() for line in f]
+        except IOError as e:
+            print(f"Failed to load city list: {e}")
+            return 0
+        entries = {fold(line): line for line in lines if line and not line.startswith("#")}
+        new = [(k, v) for k, v in entries.items() if k not in self._known]
+        # One sort for the whole file instead of an insort per line
+        self._bundled = sorted(self._bundled + new)
+        self._known.update(k for k, _ in new)
+        return len(new)
+
+    def add(self, cities: Iterable[str]):
+        """Add the user's own cities; they are suggested first."""
+        new = []
+        for city in cities:
+            entry = (fold(city), city)
+            if not entry[0] or entry in self._personal_set:
+                continue
+            self._personal_set.add(entry)
+            self._known.add(entry[0])
+            new.append(entry)
+        if len(new) == 1:
+            insort(self._personal, new[0])
+        elif new:
+            # One sort for a whole history instead of an insort per city
+            self._personal = sorted(self._personal + new)
+
+    def suggest(self, prefix: str, limit: int = 8) -> List[str]:
+        """Up to ``limit`` city keys starting with ``prefix``."""
+        folded = fold(prefix)
+        if not folded:
+            return []
+        found: List[str] = []
+        seen = set()
+        for entries in (self._personal, self._bundled):
+            i = bisect_left(entries, (folded, ""))
+            while i < len(entries) and len(found) < limit:
+                key, city = entries[i]
+                if not key.startswith(folded):
+                    break
+                if key not in seen:
+                    seen.add(key)
+                    found.append(city)
+                i += 1
+        return found
+
+    def __len__(self) -> int:
+        return len(self._known)
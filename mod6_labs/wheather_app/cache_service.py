@@ -0,0 +1,203 @@
+# cache_service.py
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple
+
+FRESH = "fresh"
+STALE = "stale"
+
+
+class CacheEntry:
+    """A cached value plus the time it was fetched and how long it stays fresh."""
+
+    __slots__ = ("value", "fetched_at", "ttl")
+
+    def __init__(self, value: Any, fetched_at: float, ttl: float):
+        self.value = value
+        self.fetched_at = fetched_at
+        self.ttl = ttl
+
+    def age(self, now: float) -> float:
+        return now - self.fetched_at
+
+
+class ResponseCache:
+    """In-memory TTL + LRU cache for API responses.
+
+    Entries younger than their TTL are "fresh". Entries past their TTL but
+    younger than ``stale_ttl`` are "stale": still usable while a refresh
+    runs in the background. Anything older is treated as a miss.
+    """
+
+    def __init__(self, max_entries: int = 256, stale_ttl: float = 3600):
+        self.max_entries = max_entries
+        self.stale_ttl = stale_ttl
+        self._entries: "OrderedDict[Hashable, CacheEntry]" = OrderedDict()
+
+        # Counters
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def lookup(self, key: Hashable) -> Tuple[Any, Optional[str]]:
+        """Return ``(value, state)`` where state is FRESH, STALE or None."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None, None
+
+        age = entry.age(time.time())
+        if age < entry.ttl:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.value, FRESH
+        if age < entry.ttl + self.stale_ttl:
+            self._entries.move_to_end(key)
+            self.stale_hits += 1
+            return entry.value, STALE
+
+        # Too old to serve normally; kept (until LRU eviction) as a last
+        # resort for when the API is down
+        self.misses += 1
+        return None, None
+
+    def peek(self, key: Hashable) -> Any:
+        """Return a cached value whatever its age, without touching counters."""
+        entry = self._entries.get(key)
+        return entry.value if entry is not None else None
+
+    def set(self, key: Hashable, value: Any, ttl: float, fetched_at: Optional[float] = None):
+        """Store a value, evicting the least recently used entries if full."""
+        self._entries[key] = CacheEntry(value, fetched_at or time.time(), ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable):
+        self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, float]:
+        """Return hit/miss counters. Every hit is one API call saved."""
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": (self.hits + self.stale_hits) / lookups if lookups else 0.0,
+        }
+
+
+class DiskCache:
+    """SQLite-backed store of raw API payloads so the app can start warm.
+
+    The database is opened lazily on first use. All methods are blocking,
+    so callers on the event loop should run them with ``asyncio.to_thread``.
+    """
+
+    EVICT_EVERY = 50  # run eviction after this many writes
+
+    def __init__(self, path: str, max_rows: int = 500, max_age: float = 86400):
+        self.path = path
+        self.max_rows = max_rows
+        self.max_age = max_age
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            folder = os.path.dirname(self.path)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS responses (
+                    endpoint TEXT NOT NULL,
+                    city TEXT NOT NULL,
+                    units TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    PRIMARY KEY (endpoint, city, units)
+                )
+                """
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_responses_fetched ON responses (fetched_at)"
+            )
+            self._conn.commit()
+            self._evict()
+        return self._conn
+
+    def get(self, key: Tuple[str, str, str]) -> Optional[Tuple[Any, float]]:
+        """Return ``(payload, fetched_at)`` for a key, or None."""
+        with self._lock:
+            try:
+                row = self._connect().execute(
+                    "SELECT payload, fetched_at FROM responses "
+                    "WHERE endpoint = ? AND city = ? AND units = ? AND fetched_at >= ?",
+                    (*key, time.time() - self.max_age),
+                ).fetchone()
+            except sqlite3.Error as e:
+                print(f"Disk cache read failed: {e}")
+                return None
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1]
+
+    def get_many(self, keys: Iterable[Tuple[str, str, str]]) -> List[Tuple[Tuple[str, str, str], Any, float]]:
+        """Return ``(key, payload, fetched_at)`` for every key found on disk."""
+        found = []
+        for key in keys:
+            row = self.get(key)
+            if row is not None:
+                found.append((key, row[0], row[1]))
+        return found
+
+    def put(self, key: Tuple[str, str, str], payload: Any, fetched_at: Optional[float] = None):
+        """Save a payload, replacing any older copy for the same key."""
+        with self._lock:
+            try:
+                conn = self._connect()
+                conn.execute(
+                    "INSERT OR REPLACE INTO responses (endpoint, city, units, payload, fetched_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (*key, json.dumps(payload), fetched_at or time.time()),
+                )
+                conn.commit()
+                self._writes += 1
+                if self._writes % self.EVICT_EVERY == 0:
+                    self._evict()
+            except sqlite3.Error as e:
+                print(f"Disk cache write failed: {e}")
+
+    def _evict(self):
+        """Drop expired rows, then the oldest rows beyond the size cap."""
+        conn = self._conn
+        conn.execute("DELETE FROM responses WHERE fetched_at < ?", (time.time() - self.max_age,))
+        conn.execute(
+            "DELETE FROM responses WHERE rowid NOT IN "
+            "(SELECT rowid FROM responses ORDER BY fetched_at DESC LIMIT ?)",
+            (self.max_rows,),
+        )
+        conn.commit()
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
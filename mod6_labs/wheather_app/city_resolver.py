@@ -0,0 +1,142 @@
+# city_resolver.py
+import json
+import os
+import threading
+from typing import Dict, Optional
+
+from storage import atomic_write
+
+CITY_INDEX_FILE = "cache/city_index.json"
+
+
+def canonical_name(city: str) -> str:
+    """Tidy a user-typed city: "new  york" -> "New York", "london, gb" -> "London,GB"."""
+    name, _, country = city.partition(",")
+    name = " ".join(name.split()).title()
+    country = country.strip().upper()
+    return f"{name},{country}" if country else name
+
+
+class CityRef:
+    """A city as identified by OpenWeatherMap."""
+
+    __slots__ = ("id", "name", "country", "lat", "lon")
+
+    def __init__(self, id: int, name: str, country: str, lat: float, lon: float):
+        self.id = id
+        self.name = name
+        self.country = country
+        self.lat = lat
+        self.lon = lon
+
+    @property
+    def key(self) -> str:
+        """Canonical key stored in history and the watchlist, e.g. "London,GB"."""
+        return f"{self.name},{self.country}" if self.country else self.name
+
+    def to_dict(self) -> Dict:
+        return {"id": self.id, "name": self.name, "country": self.country, "lat": self.lat, "lon": self.lon}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "CityRef":
+        return cls(data["id"], data["name"], data.get("country", ""), data.get("lat"), data.get("lon"))
+
+    def __repr__(self):
+        return f"CityRef({self.key!r}, id={self.id})"
+
+
+class CityResolver:
+    """Remembers which OpenWeatherMap city each typed name resolved to.
+
+    Names are learned from API responses (no extra geocoding call) and
+    saved to a JSON file, so later lookups can query by city id. The file
+    is read by load(), off the UI loop; until then lookups just miss.
+    """
+
+    def __init__(self, file_path: str = CITY_INDEX_FILE):
+        self.file_path = file_path
+        self._refs: Dict[int, CityRef] = {}
+        self._aliases: Dict[str, int] = {}  # normalized name or key -> city id
+        self._loaded = False
+        self._load_lock = threading.Lock()  # one reader, others wait for it
+        self._lock = threading.Lock()  # guards changes to the map
+        self._save_lock = threading.Lock()
+        self.dirty = False  # True when there are unsaved changes
+
+    @staticmethod
+    def _normalize(city: str) -> str:
+        return canonical_name(city).lower()
+
+    def load(self):
+        """Read the saved map once. Blocking; safe to call from any thread
+        (callers wait for a load already running)."""
+        if self._loaded:
+            return
+        with self._load_lock:
+            if self._loaded:
+                return
+            refs: Dict[int, CityRef] = {}
+            aliases: Dict[str, int] = {}
+            if os.path.exists(self.file_path):
+                try:
+                    with open(self.file_path, "r", encoding="utf-8") as f:
+                        data = json.load(f)
+                    for item in data.get("cities", []):
+                        ref = CityRef.from_dict(item)
+                        refs[ref.id] = ref
+                    aliases.update({k: int(v) for k, v in data.get("aliases", {}).items()})
+                except (json.JSONDecodeError, IOError, KeyError, TypeError, ValueError):
+                    refs, aliases = {}, {}
+            with self._lock:
+                # Anything learned while the file was being read wins
+                refs.update(self._refs)
+                aliases.update(self._aliases)
+                self._refs, self._aliases = refs, aliases
+                self._loaded = True
+
+    def lookup(self, city: str) -> Optional[CityRef]:
+        """Return the resolved city for a name or key, if known. Never
+        reads the file, so it is safe on the UI loop before load()."""
+        city_id = self._aliases.get(self._normalize(city))
+        return self._refs.get(city_id) if city_id is not None else None
+
+    def learn(self, query: str, payload: Dict) -> Optional[CityRef]:
+        """Record the city a query resolved to, from a weather or forecast
+        payload. Returns the CityRef, or None if the payload has no id."""
+        info = payload.get("city", payload)  # forecast nests it under "city"
+        city_id = info.get("id")
+        if not city_id:
+            return None
+        coord = info.get("coord", {})
+        country = info.get("country") or payload.get("sys", {}).get("country", "")
+        ref = CityRef(city_id, info.get("name", query), country, coord.get("lat"), coord.get("lon"))
+
+        known = self._refs.get(city_id)
+        if known is not None and known.key == ref.key and self.lookup(query) is known:
+            return known
+        with self._lock:
+            self._refs[city_id] = ref
+            self._aliases[self._normalize(query)] = city_id
+            self._aliases[self._normalize(ref.key)] = city_id
+            self.dirty = True
+        return ref
+
+    def snapshot(self) -> Dict:
+        """Copy of the map to save. Call on the event loop, then pass the
+        result to save() in a worker thread."""
+        with self._lock:
+            self.dirty = False
+            return {
+                "cities": [ref.to_dict() for ref in self._refs.values()],
+                "aliases": dict(self._aliases),
+            }
+
+    def save(self, data: Optional[Dict] = None):
+        """Write the map to disk atomically. Blocking; run off the UI loop."""
+        if data is None:
+            data = self.snapshot()
+        with self._save_lock:
+            try:
+                atomic_write(self.file_path, json.dumps(data))
+            except IOError as e:
+                print(f"Failed to save city index: {e}")
@@ -2,13 +2,16 @@
 """Configuration management for the Weather App."""
 
 import os
-from dotenv import load_dotenv
 
-# Load environment variables from .env file
-load_dotenv()
+# Folder of the app's bundled files, so they are found from any working directory
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
 
 class Config:
-    """Application configuration."""
+    """Application configuration.
+
+    Nothing is read from disk at import: the .env file is loaded by
+    Config.load(), which the weather service calls when it first starts.
+    """
     
     # API Configuration
     API_KEY = os.getenv("OPENWEATHER_API_KEY", "")
@@ -16,6 +19,10 @@ class Config:
         "OPENWEATHER_BASE_URL", 
         "https://api.openweathermap.org/data/2.5/weather"
     )
+    FORECAST_URL = os.getenv(
+        "OPENWEATHER_FORECAST_URL",
+        "https://api.openweathermap.org/data/2.5/forecast"
+    )
     
     # App Configuration
     APP_TITLE = "Weather App"
@@ -23,8 +30,95 @@ class Config:
     APP_HEIGHT = 600
     
     # API Settings
-    UNITS = "metric"  # metric, imperial, or standard
+    UNITS = "metric"  # display units: metric, imperial, or standard
     TIMEOUT = 10  # seconds
+
+    # HTTP Client Settings (one pooled client is shared by every request)
+    MAX_CONNECTIONS = 20
+    MAX_KEEPALIVE_CONNECTIONS = 10
+    KEEPALIVE_EXPIRY = 30  # seconds an idle connection is kept open
+    HTTP2 = False  # needs the "h2" package (pip install "httpx[http2]")
+
+    # Response Cache Settings (OpenWeatherMap updates about every 10 minutes)
+    CACHE_TTL = {"weather": 600, "forecast": 1800}  # seconds, per endpoint
+    CACHE_MAX_ENTRIES = 256
+    CACHE_STALE_TTL = 3600  # serve stale data this long while refreshing
+
+    # Rate Limit Settings (free tier allows about 60 calls per minute)
+    RATE_LIMIT_CALLS = 60
+    RATE_LIMIT_PERIOD = 60  # seconds
+    RATE_LIMIT_BURST = 10  # calls allowed back to back
+
+    # Retry Settings (only for idempotent GET requests)
+    MAX_RETRIES = 2
+    RETRY_BASE_DELAY = 0.5  # seconds, doubled on each attempt
+    RETRY_MAX_DELAY = 8  # seconds
+
+    # Circuit Breaker Settings
+    BREAKER_WINDOW = 20  # recent calls used to compute the error rate
+    BREAKER_MIN_CALLS = 5  # don't trip on fewer calls than this
+    BREAKER_FAILURE_RATE = 0.5  # open the circuit at this error rate
+    BREAKER_RESET_TIMEOUT = 30  # seconds before a half-open probe
+
+    # City Resolution (typed names -> OpenWeatherMap city ids)
+    CITY_INDEX_FILE = "cache/city_index.json"
+
+    # Batch Settings (watchlist and other multi-city fetches)
+    BATCH_CONCURRENCY = 5  # requests in flight at once
+    BATCH_DEADLINE = 30  # seconds for the whole batch
+    BATCH_CITY_TIMEOUT = 6  # seconds per city, so one slow city can't hold up the rest
+    WATCHLIST_PAGE_SIZE = 24  # watchlist cards built and fetched per scroll page
+
+    # Disk Cache Settings (raw payloads kept between runs)
+    DISK_CACHE_ENABLED = True
+    DISK_CACHE_FILE = "cache/weather_cache.db"
+    DISK_CACHE_MAX_ROWS = 500
+    DISK_CACHE_MAX_AGE = 86400  # seconds; older rows are evicted
+
+    # Refresh Settings (auto-refresh of the current city and watchlist)
+    REFRESH_INTERVAL = 300  # seconds, used when the data's age is unknown
+    PROVIDER_UPDATE_INTERVAL = 600  # OpenWeatherMap publishes about this often
+    REFRESH_MIN_INTERVAL = 60  # seconds
+    REFRESH_MAX_INTERVAL = 1800  # seconds
+    REFRESH_JITTER = 0.1  # +/- fraction added to each delay
+
+    # Search History (append-only journal, compacted in the background)
+    HISTORY_MENU_SIZE = 10  # recent cities in the search box menu
+    HISTORY_WARM_SIZE = 100  # recent cities preloaded from the disk cache
+
+    # Startup Prefetch (background, low priority)
+    PREFETCH_TOP_K = 5  # most-searched cities, by decayed frequency
+    PREFETCH_LIMIT = 60  # cities at most, including the watchlist
+
+    # Autocomplete (local prefix search, no network calls)
+    CITY_LIST_FILE = os.path.join(APP_DIR, "data", "cities.txt")
+    AUTOCOMPLETE_LIMIT = 8  # suggestions shown
+    AUTOCOMPLETE_DEBOUNCE = 0.15  # seconds of no typing before suggesting
+
+    # Icon Cache (condition icons are downloaded once and served locally)
+    ICON_CACHE_DIR = "cache/icons"
+
+    # Startup Budget (checked by startup_timing.py)
+    STARTUP_IMPORT_BUDGET = 1.5  # seconds to import the app's modules
+    STARTUP_SERVICES_BUDGET = 0.25  # seconds to build the services and load saved data
+    STARTUP_FIRST_PAINT_BUDGET = 0.5  # seconds from main() to the first frame
+
+    _loaded = False
+
+    @classmethod
+    def load(cls):
+        """Load the .env file and re-read the API settings. Runs once;
+        blocking, so call it off the UI loop."""
+        if cls._loaded:
+            return
+        # Imported here so startup doesn't pay for it before the first frame
+        from dotenv import load_dotenv
+
+        load_dotenv()
+        cls.API_KEY = os.getenv("OPENWEATHER_API_KEY", "")
+        cls.BASE_URL = os.getenv("OPENWEATHER_BASE_URL", cls.BASE_URL)
+        cls.FORECAST_URL = os.getenv("OPENWEATHER_FORECAST_URL", cls.FORECAST_URL)
+        cls._loaded = True
     
     @classmethod
     def validate(cls):
@@ -35,6 +129,3 @@ class Config:
                 "Please create a .env file with your API key."
             )
         return True
-
-# Validate configuration on import
-Config.validate()
\ No newline at end of file
@@ -0,0 +1,133 @@
+# forecast_aggregator.py
+"""Vectorized summaries of the 5-day / 3-hour forecast.
+
+A ForecastFrame loads the forecast points into NumPy arrays once and
+derives every view from them: true daily min/max/mean, precipitation
+totals and dominant condition, plus hourly and 3-hourly series. Days are
+bucketed in the city's own timezone, not the machine's or UTC.
+"""
+from datetime import datetime, timezone
+from typing import NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from models import DailySummary, Forecast
+
+SECONDS_PER_DAY = 86400
+SECONDS_PER_HOUR = 3600
+
+
+class Series(NamedTuple):
+    """A time series: UTC timestamps plus values at those times."""
+    dt: np.ndarray
+    temp: np.ndarray
+    pop: np.ndarray
+    precip: np.ndarray
+
+
+def _floats(values) -> np.ndarray:
+    """Array of floats with NaN where a value is missing (None)."""
+    return np.array([np.nan if v is None else v for v in values], dtype=float)
+
+
+class ForecastFrame:
+    """Column arrays for one Forecast, built from a single pass over it."""
+
+    __slots__ = (
+        "forecast", "dt", "temp", "temp_min", "temp_max", "humidity",
+        "pop", "precip", "condition", "local_day",
+    )
+
+    def __init__(self, forecast: Forecast):
+        points = forecast.points
+        self.forecast = forecast
+        self.dt = np.array([p.dt for p in points], dtype=np.int64)
+        self.temp = _floats(p.temp for p in points)
+        self.temp_min = _floats(p.temp_min for p in points)
+        self.temp_max = _floats(p.temp_max for p in points)
+        self.humidity = _floats(p.humidity for p in points)
+        self.pop = np.array([p.pop for p in points], dtype=float)
+        self.precip = np.array([p.rain + p.snow for p in points], dtype=float)
+        self.condition = np.array([p.condition_id or 0 for p in points], dtype=np.int64)
+        # Day number in the city's local time (points are sorted by dt)
+        self.local_day = (self.dt + forecast.timezone) // SECONDS_PER_DAY
+
+    def __len__(self) -> int:
+        return len(self.dt)
+
+    # ---------- VIEWS ----------
+    def daily(self) -> Tuple[DailySummary, ...]:
+        """One summary per local calendar day, using every 3-hour point."""
+        if not len(self):
+            return ()
+        days, starts, day_index, counts = np.unique(
+            self.local_day, return_index=True, return_inverse=True, return_counts=True
+        )
+
+        # fmin/fmax skip NaN, so a missing value never hides the real extremes
+        lows = np.fmin.reduceat(np.fmin(self.temp_min, self.temp), starts)
+        highs = np.fmax.reduceat(np.fmax(self.temp_max, self.temp), starts)
+        valid = ~np.isnan(self.temp)
+        temp_sums = np.add.reduceat(np.where(valid, self.temp, 0.0), starts)
+        temp_counts = np.add.reduceat(valid.astype(np.int64), starts)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = temp_sums / temp_counts
+        precip = np.add.reduceat(self.precip, starts)
+        pop = np.maximum.reduceat(self.pop, starts)
+        humidity = np.fmax.reduceat(self.humidity, starts)
+
+        # Dominant condition: most frequent condition id in each day
+        codes, code_index = np.unique(self.condition, return_inverse=True)
+        tally = np.zeros((len(days), len(codes)), dtype=np.int64)
+        np.add.at(tally, (day_index, code_index), 1)
+        dominant = tally.argmax(axis=1)
+
+        # First point of each day that has the dominant condition
+        matches = np.flatnonzero(code_index == dominant[day_index])
+        _, first = np.unique(day_index[matches], return_index=True)
+        representative = matches[first]
+
+        points = self.forecast.points
+        summaries = []
+        for i, day in enumerate(days):
+            point = points[representative[i]]
+            summaries.append(DailySummary(
+                date=datetime.fromtimestamp(int(day) * SECONDS_PER_DAY, tz=timezone.utc).strftime("%Y-%m-%d"),
+                temp_min=_or_none(lows[i]),
+                temp_max=_or_none(highs[i]),
+                temp_mean=_or_none(means[i]),
+                humidity_max=_or_none(humidity[i]),
+                precip_total=float(precip[i]),
+                pop_max=float(pop[i]),
+                condition_id=int(codes[dominant[i]]) or None,
+                main=point.main,
+                description=point.description,
+                icon=point.icon[:2] + "d",  # daily cards use the daytime icon
+                samples=int(counts[i]),
+            ))
+        return tuple(summaries)
+
+    def three_hourly(self) -> Series:
+        """The forecast points as provided by the API."""
+        return Series(self.dt, self.temp, self.pop, self.precip)
+
+    def hourly(self) -> Series:
+        """Hourly series: temperature linearly interpolated between points,
+        precipitation chance held and precipitation spread evenly over each
+        3-hour step."""
+        if not len(self):
+            return self.three_hourly()
+        hours = np.arange(self.dt[0], self.dt[-1] + 1, SECONDS_PER_HOUR, dtype=np.int64)
+        valid = ~np.isnan(self.temp)
+        temp = np.interp(hours, self.dt[valid], self.temp[valid]) if valid.any() else np.full(len(hours), np.nan)
+        step = np.clip(np.searchsorted(self.dt, hours, side="right") - 1, 0, len(self) - 1)
+        return Series(hours, temp, self.pop[step], self.precip[step] / 3.0)
+
+
+def _or_none(value) -> Optional[float]:
+    return None if np.isnan(value) else float(value)
+
+
+def aggregate_daily(forecast: Forecast) -> Tuple[DailySummary, ...]:
+    """Shortcut for ForecastFrame(forecast).daily()."""
+    return ForecastFrame(forecast).daily()
@@ -1,54 +1,259 @@
 # history_service.py
+import atexit
+import heapq
 import json
+import math
 import os
-from typing import List
+import queue
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
 
-HISTORY_FILE = "search_history.json"
-MAX_HISTORY = 10  # you can change this if you want more saved searches
+from city_resolver import canonical_name
+from storage import atomic_write
+
+HISTORY_FILE = "search_history.jsonl"
+LEGACY_HISTORY_FILE = "search_history.json"  # old format: one JSON list
+MAX_HISTORY = 5000  # cities remembered; a search costs the same at any size
+COMPACT_MIN_LINES = 200  # don't compact journals shorter than this
+HALF_LIFE = 7 * 86400  # seconds for a search to count half as much
+
+
+class HistoryEntry:
+    """Usage of one city: search count, last search and decayed score.
+
+    ``score`` is the sum of 2 ** (-age / half_life) over every search,
+    kept as of ``last``: each new search decays it to now and adds 1.
+    """
+
+    __slots__ = ("count", "last", "score")
+
+    def __init__(self, count: int = 0, last: float = 0.0, score: float = 0.0):
+        self.count = count
+        self.last = last
+        self.score = score
+
+    def touch(self, now: float, half_life: float):
+        self.score = self.score * 2 ** (-(now - self.last) / half_life) + 1 if self.count else 1.0
+        self.count += 1
+        self.last = now
+
+    def rank(self, half_life: float) -> float:
+        """Sort key for the decayed score. log2(score) + last / half_life
+        orders entries exactly as their scores decayed to any common time
+        would, so ranking never has to recompute decay for every city."""
+        return math.log2(max(self.score, 1e-12)) + self.last / half_life
+
+    def to_record(self, city: str) -> Dict:
+        return {"city": city, "ts": round(self.last, 3), "count": self.count, "score": round(self.score, 6)}
 
 
 class HistoryService:
-    """Handles saving and loading search history from a JSON file."""
+    """Search history kept as an append-only journal.
+
+    Each search appends one JSON line ({"city": ..., "ts": ...}) instead of
+    rewriting the whole file. In memory, an OrderedDict keyed by city gives
+    O(1) dedupe and move-to-front, and each entry keeps a search count and
+    a frequency score that decays with age (see top_cities). All file I/O runs on one background
+    thread; when the journal has grown to about twice the live entries it
+    is compacted into a fresh file and swapped in with an atomic rename.
+    A torn last line (e.g. after a crash) is skipped, not fatal.
+
+    The journal is read by load(), not the constructor, so the app can
+    build the service before its first frame and load it in the background;
+    every public method loads it first if that hasn't happened yet.
+    """
 
-    def __init__(self):
-        self.file_path = HISTORY_FILE
-        self.history: List[str] = []
-        self._load_history()
+    def __init__(
+        self,
+        file_path: str = HISTORY_FILE,
+        max_history: int = MAX_HISTORY,
+        half_life: float = HALF_LIFE,
+    ):
+        self.file_path = file_path
+        self.max_history = max_history
+        self.half_life = half_life
+        self._index: "OrderedDict[str, HistoryEntry]" = OrderedDict()  # oldest search first
+        self._journal_lines = 0
+        self._queue: "queue.Queue" = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        self._loaded = False
+        self._load_lock = threading.Lock()
+        # The writer is a daemon thread: drain its queue before exit
+        atexit.register(self.flush)
+
+    # ---------- LOADING ----------
+    def load(self):
+        """Read the journal the first time it is needed. Blocking; safe to
+        call from any thread (callers wait for a load already running)."""
+        if self._loaded:
+            return
+        with self._load_lock:
+            if not self._loaded:
+                self._load_history()
+                self._loaded = True
 
     def _load_history(self):
-        """Load search history from file, if it exists."""
-        if os.path.exists(self.file_path):
-            try:
-                with open(self.file_path, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                    if isinstance(data, list):
-                        self.history = data
-            except (json.JSONDecodeError, IOError):
-                # Corrupt or unreadable file → reset it
-                self.history = []
+        """Replay the journal (or migrate the old JSON list) into memory."""
+        if not os.path.exists(self.file_path):
+            self._migrate_legacy()
+            return
+        damaged = False
+        try:
+            with open(self.file_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    self._journal_lines += 1
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        damaged = True  # torn or corrupt line
+                        continue
+                    # An unterminated last line would swallow the next append
+                    damaged = damaged or not line.endswith("\n")
+                    self._replay(record)
+        except IOError as e:
+            print(f"Failed to load history: {e}")
+            return
+        self._trim()
+        if damaged or self._needs_compaction():
+            self._compact()
+
+    def _replay(self, record: Dict):
+        if not isinstance(record, dict):
+            return
+        city = record.get("city")
+        if not isinstance(city, str) or not city:
+            return
+        ts = record.get("ts") or 0.0
+        if "count" in record:
+            # Compacted line: the whole entry at once
+            entry = HistoryEntry(record.get("count") or 1, ts, record.get("score") or 1.0)
         else:
-            self.history = []
+            # One search
+            entry = self._index.get(city) or HistoryEntry()
+            entry.touch(ts, self.half_life)
+        self._index[city] = entry
+        self._index.move_to_end(city)
 
-    def _save_history(self):
-        """Write the current history to the file."""
+    def _migrate_legacy(self):
+        """Convert search_history.json (newest first) to the journal."""
+        legacy = os.path.join(os.path.dirname(self.file_path), LEGACY_HISTORY_FILE)
+        if not os.path.exists(legacy):
+            return
         try:
-            with open(self.file_path, "w", encoding="utf-8") as f:
-                json.dump(self.history, f, indent=2)
-        except IOError as e:
-            print(f"Failed to save history: {e}")
+            with open(legacy, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (json.JSONDecodeError, IOError):
+            return
+        if isinstance(data, list):
+            for city in reversed(data):
+                if isinstance(city, str) and city:
+                    self._replay({"city": canonical_name(city), "ts": 0.0})
+        self._compact(remove=legacy)
+
+    # ---------- WRITES ----------
+    def _submit(self, job):
+        """Queue a job for the writer thread, starting it if needed."""
+        if self._writer is None or not self._writer.is_alive():
+            self._writer = threading.Thread(target=self._run_writer, name="history-writer", daemon=True)
+            self._writer.start()
+        self._queue.put(job)
+
+    def _run_writer(self):
+        while True:
+            job = self._queue.get()
+            try:
+                job()
+            except IOError as e:
+                print(f"Failed to save history: {e}")
+            finally:
+                self._queue.task_done()
+
+    def _append(self, record: Dict):
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+
+        def write():
+            with open(self.file_path, "a", encoding="utf-8") as f:
+                f.write(line)
+
+        self._journal_lines += 1
+        self._submit(write)
+        if self._needs_compaction():
+            self._compact()
+
+    def _needs_compaction(self) -> bool:
+        return self._journal_lines > max(COMPACT_MIN_LINES, 2 * len(self._index))
 
+    def _compact(self, remove: Optional[str] = None):
+        """Rewrite the journal as one line per live entry, in the background."""
+        # Snapshot now, on the caller's thread, so later searches are
+        # appended after the compacted file is in place
+        text = "".join(
+            json.dumps(entry.to_record(city), separators=(",", ":")) + "\n"
+            for city, entry in self._index.items()
+        )
+        self._journal_lines = len(self._index)
+
+        def write():
+            atomic_write(self.file_path, text)
+            if remove is not None:
+                os.remove(remove)
+
+        self._submit(write)
+
+    def _trim(self):
+        while len(self._index) > self.max_history:
+            self._index.popitem(last=False)
+
+    def flush(self):
+        """Wait until every queued write has reached the disk."""
+        if self._writer is not None:
+            self._queue.join()
+
+    # ---------- PUBLIC API ----------
     def add_city(self, city: str):
         """Add a city to the search history, avoiding duplicates."""
         if not city:
             return
-        city = city.strip().title()
-        if city in self.history:
-            self.history.remove(city)
-        self.history.insert(0, city)
-        if len(self.history) > MAX_HISTORY:
-            self.history = self.history[:MAX_HISTORY]
-        self._save_history()
-
-    def get_history(self) -> List[str]:
-        """Return the list of saved city names."""
-        return self.history
\ No newline at end of file
+        self.load()
+        city = canonical_name(city)
+        now = time.time()
+        entry = self._index.get(city) or HistoryEntry()
+        entry.touch(now, self.half_life)
+        self._index[city] = entry
+        self._index.move_to_end(city)
+        self._trim()
+        self._append({"city": city, "ts": round(now, 3)})
+
+    def get_history(self, limit: Optional[int] = None) -> List[str]:
+        """Return saved city names, most recent first (up to ``limit``)."""
+        # list() copies the keys in one step, so this is safe to call from
+        # a handler thread while a search is being added on the loop
+        self.load()
+        cities = list(self._index)[::-1]
+        return cities if limit is None else cities[:limit]
+
+    def top_cities(self, k: int) -> List[str]:
+        """The ``k`` cities with the highest decayed search frequency: a
+        city searched often recently beats one searched once today and one
+        searched often months ago."""
+        self.load()
+        entries = list(self._index.items())
+        best = heapq.nlargest(k, entries, key=lambda item: item[1].rank(self.half_life))
+        return [city for city, _ in best]
+
+    def get_entry(self, city: str) -> Optional[HistoryEntry]:
+        """Usage stats for a city, if it is in the history."""
+        self.load()
+        return self._index.get(canonical_name(city))
+
+    def clear_history(self):
+        """Forget every saved search."""
+        self.load()
+        self._index.clear()
+        self._compact()
+
+    def __len__(self) -> int:
+        self.load()
+        return len(self._index)
@@ -0,0 +1,109 @@
+# icon_service.py
+"""Weather condition icons served locally instead of from the network.
+
+OpenWeatherMap uses 18 icon codes (9 conditions, day and night). Each is
+downloaded once into the icon folder and kept in memory as base64, so
+ft.Image controls embed the picture and the client never fetches a URL.
+"""
+import asyncio
+import base64
+import os
+from typing import Dict, Iterable, Optional
+
+import flet as ft
+import httpx
+
+from storage import atomic_write
+
+ICON_URL = "https://openweathermap.org/img/wn/{code}@2x.png"
+ICON_CACHE_DIR = "cache/icons"
+ICON_CODES = tuple(
+    f"{number}{time}"
+    for number in ("01", "02", "03", "04", "09", "10", "11", "13", "50")
+    for time in "dn"
+)
+
+
+def icon_url(code: str) -> str:
+    return ICON_URL.format(code=code)
+
+
+class IconStore:
+    """Icon images by code, loaded from disk or downloaded once."""
+
+    def __init__(self, folder: str = ICON_CACHE_DIR, timeout: float = 10):
+        self.folder = folder
+        self.timeout = timeout
+        self._data: Dict[str, str] = {}  # icon code -> base64 PNG
+        self.downloaded = 0
+
+    def get(self, code: str) -> Optional[str]:
+        """Base64 PNG for an icon code, or None if not loaded yet."""
+        return self._data.get(code)
+
+    def apply(self, image: ft.Image, code: str):
+        """Point an existing image at an icon, embedded when available."""
+        data = self._data.get(code)
+        if data is not None:
+            image.src_base64 = data
+            image.src = None
+        else:
+            # Not stored yet (prefetch still running or it failed)
+            image.src = icon_url(code)
+            image.src_base64 = None
+
+    def image(self, code: str, width: int, height: int) -> ft.Image:
+        """New ft.Image showing an icon."""
+        image = ft.Image(width=width, height=height)
+        self.apply(image, code)
+        return image
+
+    # ---------- LOADING ----------
+    async def prefetch(self, codes: Iterable[str] = ICON_CODES):
+        """Load every icon, from disk when saved, otherwise from the network."""
+        codes = [c for c in codes if c not in self._data]
+        self._data.update(await asyncio.to_thread(self._read_saved, codes))
+        missing = [c for c in codes if c not in self._data]
+        if not missing:
+            return
+        async with httpx.AsyncClient(timeout=self.timeout) as client:
+            errors = await asyncio.gather(*(self._download(client, code) for code in missing))
+        failed = {code: error for code, error in zip(missing, errors) if error}
+        if failed:
+            # Those icons fall back to their URL until the next prefetch
+            print(f"Failed to fetch {len(failed)} icons ({', '.join(failed)}): {next(iter(failed.values()))}")
+
+    async def _download(self, client: httpx.AsyncClient, code: str) -> Optional[str]:
+        """Fetch and store one icon. Returns an error message on failure."""
+        try:
+            response = await client.get(icon_url(code))
+            response.raise_for_status()
+        except httpx.HTTPError as e:
+            return str(e) or type(e).__name__
+        self._data[code] = base64.b64encode(response.content).decode("ascii")
+        self.downloaded += 1
+        await asyncio.to_thread(self._save, code, response.content)
+        return None
+
+    def _path(self, code: str) -> str:
+        return os.path.join(self.folder, f"{code}.png")
+
+    def _read_saved(self, codes: Iterable[str]) -> Dict[str, str]:
+        """Read saved icons. Blocking; run off the UI loop."""
+        found = {}
+        for code in codes:
+            try:
+                with open(self._path(code), "rb") as f:
+                    content = f.read()
+            except IOError:
+                continue
+            if content:
+                found[code] = base64.b64encode(content).decode("ascii")
+        return found
+
+    def _save(self, code: str, content: bytes):
+        """Write one icon atomically. Blocking; run off the UI loop."""
+        try:
+            atomic_write(self._path(code), content)
+        except IOError as e:
+            print(f"Failed to save icon {code}: {e}")
@@ -1,19 +1,33 @@
 import asyncio
+import os
+import time
 import flet as ft
 from datetime import datetime
 from weather_service import WeatherService, WeatherServiceError
+from models import CurrentConditions, Forecast
+from rate_limiter import BACKGROUND, INTERACTIVE, PREFETCH
 from history_service import HistoryService
 from watchlist_service import WatchlistService
 from config import Config
+from units import format_temp
+from weather_card import WeatherCard
+from ui_scheduler import Debouncer, UpdateScheduler
+from icon_service import IconStore
+from refresh_scheduler import RefreshScheduler
+from autocomplete_service import CityIndex
 
 
-def run_async(coro):
+def run_async(coro, loop=None):
+    """Run a coroutine on the running loop, or hand it to the page's loop
+    when called from a sync (threaded) event handler."""
     try:
-        loop = asyncio.get_running_loop()
+        running = asyncio.get_running_loop()
     except RuntimeError:
+        if loop is not None:
+            return asyncio.run_coroutine_threadsafe(coro, loop)
         return asyncio.run(coro)
     else:
-        return loop.create_task(coro)
+        return running.create_task(coro)
 
 
 def main(page: ft.Page):
@@ -28,13 +42,58 @@ def main(page: ft.Page):
     page.padding = 20
     page.scroll = ft.ScrollMode.AUTO
 
+    # Handlers mark the page dirty; one page.update() is sent per tick
+    ui = UpdateScheduler(page)
+
+    # Building the services does no I/O: settings, saved data and the HTTP
+    # client are loaded by startup() once the first frame is on screen
     weather_service = WeatherService()
     history_service = HistoryService()
     watchlist_service = WatchlistService()
 
+    # Every periodic refresh (current city, watchlist, prefetch) runs through here
+    refresher = RefreshScheduler(
+        page.loop,
+        interval=Config.REFRESH_INTERVAL,
+        publish_interval=Config.PROVIDER_UPDATE_INTERVAL,
+        min_interval=Config.REFRESH_MIN_INTERVAL,
+        max_interval=Config.REFRESH_MAX_INTERVAL,
+        jitter=Config.REFRESH_JITTER,
+    )
+
+    async def shutdown():
+        await refresher.aclose()
+        await weather_service.aclose()
+        await asyncio.to_thread(history_service.flush)
+        await asyncio.to_thread(watchlist_service.flush)
+
+    page.on_close = lambda e: run_async(shutdown(), page.loop)
+
+    # Condition icons are embedded from a local store, not fetched per render
+    icon_store = IconStore(Config.ICON_CACHE_DIR)
+
+    # Autocomplete index, filled by startup()
+    city_index = CityIndex()
+
     # ---------- STATE ----------
     current_city = {"name": None}
+    # Last payloads shown, kept so a unit toggle can re-render them locally
+    last_data = {"city": None, "weather": None, "forecast": None}
+    # Watchlist grid on screen, the cities it pages through, and the
+    # result shown in each card slot (so a unit toggle can redraw them)
+    watchlist_view = {"cities": [], "grid": None, "loading": False, "results": {}}
     is_loading = {"value": False}
+    # Task currently running for each view slot ("search", "watchlist")
+    in_flight = {}
+
+    def run_latest(slot: str, coro):
+        """Run a coroutine for a view slot, cancelling the one it replaces
+        so superseded work never reaches the UI."""
+        previous = in_flight.get(slot)
+        if previous is not None and not previous.done():
+            previous.cancel()
+        in_flight[slot] = task = run_async(coro, page.loop)
+        return task
 
     # ---------- ALERT SYSTEM ----------
     current_snackbar = None
@@ -72,8 +131,7 @@ def main(page: ft.Page):
             duration=4000,
         )
         current_snackbar = snackbar
-        page.open(snackbar)
-        page.update()
+        page.open(snackbar)  # sends only the snackbar; no page.update() needed
 
     # ---------- TOGGLES ----------
     def toggle_theme():
@@ -85,7 +143,7 @@ def main(page: ft.Page):
             page.theme_mode = ft.ThemeMode.LIGHT
             theme_icon.icon = ft.Icons.LIGHT_MODE
             show_alert("Light mode enabled ☀️", "info")
-        page.update()
+        ui.mark_dirty()
         update_card_styles()
 
     def toggle_units():
@@ -98,10 +156,16 @@ def main(page: ft.Page):
             unit_icon.content = ft.Text("°C", size=18, weight=ft.FontWeight.BOLD)
             show_alert("Switched to Celsius (°C)", "info")
         
-        # Refresh current city if one is loaded
-        if current_city["name"]:
-            fetch_weather(current_city["name"])
-        page.update()
+        # Re-render what is on screen; the data is converted locally, no refetch
+        if last_data["weather"]:
+            render_weather(last_data["weather"], last_data["city"])
+        if last_data["forecast"]:
+            render_forecast(last_data["forecast"])
+        grid = watchlist_view["grid"]
+        if grid is not None:
+            for slot, result in list(watchlist_view["results"].items()):
+                grid.controls[slot] = build_city_card(result)
+        ui.mark_dirty()
 
     def toggle_auto_refresh():
         """Toggle auto-refresh feature"""
@@ -110,14 +174,21 @@ def main(page: ft.Page):
             auto_refresh_btn.icon = ft.Icons.SYNC_DISABLED
             auto_refresh_btn.tooltip = "Enable auto-refresh"
             show_alert("Auto-refresh disabled", "info")
+            refresher.cancel("current")
+            refresher.cancel("watchlist")
+            refresher.cancel("prefetch")
         else:
             auto_refresh_enabled["value"] = True
             auto_refresh_btn.icon = ft.Icons.SYNC
             auto_refresh_btn.tooltip = "Disable auto-refresh"
-            show_alert("Auto-refresh enabled (every 5 min)", "success")
-            if current_city["name"]:
-                run_async(auto_refresh_loop())
-        page.update()
+            show_alert("Auto-refresh enabled (when new data is published)", "success")
+            # Scheduling replaces any job under the same key, so toggling
+            # again never leaves a second loop running
+            shown = last_data["weather"]
+            refresher.schedule("current", refresh_current, shown.dt if shown else None)
+            refresher.schedule("watchlist", refresh_watchlist)
+            refresher.schedule("prefetch", prefetch_hot)
+        ui.mark_dirty()
 
     # ---------- HEADER ----------
     title = ft.Text("🌤️ Weather App", size=32, weight=ft.FontWeight.BOLD)
@@ -143,8 +214,28 @@ def main(page: ft.Page):
         on_click=lambda e: toggle_auto_refresh(),
     )
 
+    # Watchlist import/export (CSV or JSON)
+    import_picker = ft.FilePicker(on_result=lambda e: on_import_picked(e))
+    export_picker = ft.FilePicker(on_result=lambda e: on_export_picked(e))
+    page.overlay.extend([import_picker, export_picker])
+
+    import_btn = ft.IconButton(
+        icon=ft.Icons.UPLOAD_FILE,
+        tooltip="Import watchlist (CSV/JSON)",
+        on_click=lambda e: import_picker.pick_files(
+            dialog_title="Import watchlist", allowed_extensions=["csv", "json"]
+        ),
+    )
+    export_btn = ft.IconButton(
+        icon=ft.Icons.SAVE_ALT,
+        tooltip="Export watchlist",
+        on_click=lambda e: export_picker.save_file(
+            dialog_title="Export watchlist", file_name="watchlist.csv", allowed_extensions=["csv", "json"]
+        ),
+    )
+
     header = ft.Row(
-        [title, ft.Row([unit_icon, auto_refresh_btn, theme_icon], spacing=10)],
+        [title, ft.Row([import_btn, export_btn, unit_icon, auto_refresh_btn, theme_icon], spacing=10)],
         alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
         width=850,
     )
@@ -155,6 +246,7 @@ def main(page: ft.Page):
         width=550,
         height=60,
         on_focus=lambda e: show_recent_history(),
+        on_change=lambda e: suggest_later(city_input.value),
         on_submit=lambda e: fetch_weather(city_input.value),
         autofocus=True,
         hint_text="e.g., London, Tokyo, New York",
@@ -162,6 +254,25 @@ def main(page: ft.Page):
         prefix_icon=ft.Icons.LOCATION_CITY,
     )
 
+    # Suggestion rows are built once and patched as the user types
+    suggestion_items = [
+        ft.ListTile(
+            leading=ft.Icon(ft.Icons.LOCATION_ON_OUTLINED, size=18),
+            title=ft.Text(size=14),
+            dense=True,
+            visible=False,
+            on_click=lambda e: pick_suggestion(e.control.data),
+        )
+        for _ in range(Config.AUTOCOMPLETE_LIMIT)
+    ]
+    suggestions_box = ft.Container(
+        content=ft.Column(suggestion_items, spacing=0),
+        width=550,
+        border=ft.border.all(1, ft.Colors.BLUE_100),
+        border_radius=8,
+        visible=False,
+    )
+
     search_button = ft.ElevatedButton(
         "🔍 Search",
         on_click=lambda e: fetch_weather(city_input.value),
@@ -183,7 +294,7 @@ def main(page: ft.Page):
     view_watchlist_btn = ft.IconButton(
         icon=ft.Icons.VIEW_LIST,
         tooltip="Compare watchlist cities",
-        on_click=lambda e: run_async(view_watchlist()),
+        on_click=lambda e: run_latest("watchlist", view_watchlist()),
     )
     
     clear_history_btn = ft.IconButton(
@@ -199,21 +310,11 @@ def main(page: ft.Page):
     )
 
     # ---------- OUTPUT AREAS ----------
-    weather_card = ft.Container(
-        width=850,
-        border_radius=16,
-        padding=20,
-        animate=300,
-        content=ft.Column(
-            [ft.Text("Search for a city to see weather information", size=16, color=ft.Colors.GREY_600)],
-            alignment=ft.MainAxisAlignment.CENTER,
-            horizontal_alignment=ft.CrossAxisAlignment.CENTER,
-        ),
-    )
+    # Built once; each refresh patches its controls in place
+    weather_card = WeatherCard(width=850, light=page.theme_mode == ft.ThemeMode.LIGHT, icons=icon_store)
     
     forecast_section = ft.Column(spacing=10)
     watchlist_section = ft.Column(spacing=10)
-    stats_section = ft.Column(spacing=10)
 
     # Loading indicator
     loading_indicator = ft.ProgressRing(visible=False, width=40, height=40)
@@ -221,12 +322,12 @@ def main(page: ft.Page):
     def update_card_styles():
         """Apply theme-aware background colors."""
         bg_color = ft.Colors.BLUE_50 if page.theme_mode == ft.ThemeMode.LIGHT else ft.Colors.GREY_900
-        weather_card.bgcolor = bg_color
-        for section in [forecast_section, watchlist_section, stats_section]:
+        weather_card.apply_theme(page.theme_mode == ft.ThemeMode.LIGHT)
+        for section in [forecast_section, watchlist_section]:
             for ctrl in section.controls:
                 if isinstance(ctrl, ft.Container):
                     ctrl.bgcolor = bg_color
-        page.update()
+        ui.mark_dirty()
 
     # ---------- LAYOUT ----------
     layout = ft.Column(
@@ -234,9 +335,10 @@ def main(page: ft.Page):
             header,
             ft.Divider(),
             search_row,
+            ft.Row([suggestions_box], width=850),
             ft.Row([loading_indicator], alignment=ft.MainAxisAlignment.CENTER),
-            weather_card,
-            stats_section,
+            weather_card.view,
+            weather_card.stats,
             ft.Divider(),
             forecast_section,
             watchlist_section,
@@ -248,7 +350,7 @@ def main(page: ft.Page):
 
     # ---------- EVENT HANDLERS ----------
     def show_recent_history():
-        recent = history_service.get_history()
+        recent = history_service.get_history(Config.HISTORY_MENU_SIZE)
         if not recent:
             return
         city_input.suffix = ft.PopupMenuButton(
@@ -259,11 +361,37 @@ def main(page: ft.Page):
                 ) for c in recent
             ]
         )
-        page.update()
+        ui.mark_dirty()
+
+    def show_suggestions(text: str):
+        """Patch the suggestion rows for the typed text (runs on the loop)."""
+        matches = city_index.suggest(text or "", Config.AUTOCOMPLETE_LIMIT)
+        if len(matches) == 1 and matches[0] == text:
+            matches = []  # already typed out in full
+        for i, item in enumerate(suggestion_items):
+            if i < len(matches):
+                item.title.value = matches[i]
+                item.data = matches[i]
+                item.visible = True
+            else:
+                item.visible = False
+        suggestions_box.visible = bool(matches)
+        ui.mark_dirty()
+
+    suggest_later = Debouncer(page.loop, Config.AUTOCOMPLETE_DEBOUNCE, show_suggestions)
+
+    def hide_suggestions():
+        suggest_later.cancel()
+        suggestions_box.visible = False
+        ui.mark_dirty()
+
+    def pick_suggestion(city_key: str):
+        # The key is canonical ("London,GB"), so it goes to the service as is
+        fill_city(city_key)
 
     def fill_city(city):
         city_input.value = city
-        page.update()
+        ui.mark_dirty()
         fetch_weather(city)
 
     def clear_history():
@@ -271,7 +399,7 @@ def main(page: ft.Page):
         history_service.clear_history()
         show_alert("Search history cleared", "success")
         city_input.suffix = None
-        page.update()
+        ui.mark_dirty()
 
     def add_to_watchlist():
         city_name = (city_input.value or "").strip()
@@ -279,19 +407,22 @@ def main(page: ft.Page):
             show_alert("Enter a city before adding to watchlist.", "warning")
             return
         
+        # Store the resolved key (e.g. "London,GB") when the city is known
+        city_name = weather_service.canonical_key(city_name)
         if watchlist_service.city_exists(city_name):
-            show_alert(f"{city_name.title()} is already in your watchlist.", "info")
+            show_alert(f"{city_name} is already in your watchlist.", "info")
             return
         
         watchlist_service.add_city(city_name)
-        show_alert(f"{city_name.title()} added to watchlist ✅", "success")
+        city_index.add([city_name])
+        show_alert(f"{city_name} added to watchlist ✅", "success")
 
     async def view_watchlist():
-        cities = watchlist_service.get_watchlist()
+        cities = list(watchlist_service.get_watchlist())
         if not cities:
             show_alert("Your watchlist is empty.", "info")
             watchlist_section.controls = []
-            page.update()
+            ui.mark_dirty()
             return
 
         watchlist_section.controls = [
@@ -307,356 +438,381 @@ def main(page: ft.Page):
                 alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
             )
         ]
-        page.update()
 
-        async def fetch_city(city):
+        # Virtualized grid: only the first page of cards is built and
+        # fetched now; more pages load as the user scrolls near the end
+        grid = ft.GridView(
+            max_extent=170,
+            child_aspect_ratio=160 / 240,
+            spacing=10,
+            run_spacing=10,
+            height=520,
+            build_controls_on_demand=True,
+            on_scroll_interval=100,
+            on_scroll=on_watchlist_scroll,
+        )
+        watchlist_view.update(cities=cities, grid=grid, loading=False, results={})
+        watchlist_section.controls.append(grid)
+        await load_watchlist_page(grid)
+
+    async def load_watchlist_page(grid):
+        """Add the next page of cards to the grid and fill them in as their
+        weather arrives."""
+        watchlist_view["loading"] = True
+        try:
+            start = len(grid.controls)
+            cities = watchlist_view["cities"][start:start + Config.WATCHLIST_PAGE_SIZE]
+            slots = {city: start + i for i, city in enumerate(cities)}
+            grid.controls.extend(build_placeholder(c) for c in cities)
+            ui.mark_dirty()
+
+            # Bounded batch fetch; each card is filled in as its city completes
+            results = weather_service.get_weather_many(cities)
             try:
-                data = await weather_service.get_weather(city)
-                name = data.get("name", city)
-                main = data.get("main", {})
-                weather = data.get("weather", [{}])[0]
-                temp = main.get("temp", "N/A")
-                feels_like = main.get("feels_like", "N/A")
-                cond = weather.get("description", "N/A").capitalize()
-                icon = weather.get("icon", "01d")
-                icon_url = f"https://openweathermap.org/img/wn/{icon}@2x.png"
-                
-                color = ft.Colors.BLUE_100 if "clear" in cond.lower() else (
-                    ft.Colors.GREY_300 if "cloud" in cond.lower() else ft.Colors.BLUE_200)
-
-                return ft.Container(
-                    content=ft.Column(
+                async for result in results:
+                    if result.city in slots:
+                        show_city_card(grid, slots[result.city], result)
+            finally:
+                await results.aclose()  # cancels the fetches left if superseded
+        finally:
+            if watchlist_view["grid"] is grid:
+                watchlist_view["loading"] = False
+
+    def on_watchlist_scroll(e):
+        """Load the next page when the grid is scrolled near its end."""
+        grid = watchlist_view["grid"]
+        if grid is None or e.control is not grid or watchlist_view["loading"]:
+            return
+        if len(grid.controls) >= len(watchlist_view["cities"]):
+            return
+        if e.pixels >= e.max_scroll_extent - e.viewport_dimension:
+            watchlist_view["loading"] = True
+            run_latest("watchlist", load_watchlist_page(grid))
+
+    def show_city_card(grid, slot: int, result):
+        """Put a result's card in a grid slot and remember the result."""
+        grid.controls[slot] = build_city_card(result)
+        if watchlist_view["grid"] is grid:
+            watchlist_view["results"][slot] = result
+        ui.mark_dirty()
+
+    def build_placeholder(city):
+        """Card shown while a city's weather is loading."""
+        return ft.Container(
+            content=ft.Column(
+                [
+                    ft.Text(city, size=16, weight=ft.FontWeight.BOLD),
+                    ft.ProgressRing(width=30, height=30),
+                    ft.Text("Loading...", size=12, color=ft.Colors.GREY_600),
+                ],
+                alignment=ft.MainAxisAlignment.CENTER,
+                horizontal_alignment=ft.CrossAxisAlignment.CENTER,
+            ),
+            width=160,
+            height=240,
+            bgcolor=ft.Colors.GREY_100 if page.theme_mode == ft.ThemeMode.LIGHT else ft.Colors.GREY_800,
+            border_radius=12,
+            padding=10,
+        )
+
+    def build_city_card(result):
+        """Build a comparison card from one get_weather_many result."""
+        city = result.city
+        if result.error is not None:
+            return ft.Container(
+                content=ft.Column(
+                    [
+                        ft.Text(f"{city}", size=14, weight=ft.FontWeight.BOLD),
+                        ft.Icon(ft.Icons.ERROR_OUTLINE, size=40, color=ft.Colors.RED),
+                        ft.Text("Error loading", size=12),
+                        ft.IconButton(
+                            icon=ft.Icons.DELETE_OUTLINE,
+                            tooltip="Remove",
+                            on_click=lambda e, c=city: remove_from_watchlist(c),
+                        ),
+                    ],
+                    alignment=ft.MainAxisAlignment.CENTER,
+                    horizontal_alignment=ft.CrossAxisAlignment.CENTER,
+                ),
+                width=160,
+                height=240,
+                bgcolor=ft.Colors.RED_100 if page.theme_mode == ft.ThemeMode.LIGHT else ft.Colors.RED_900,
+                border_radius=12,
+                padding=10,
+            )
+
+        data = result.data
+        name = data.name or city
+        temp = data.temp
+        feels_like = data.feels_like
+        cond = data.condition
+        icon = data.icon
+
+        color = ft.Colors.BLUE_100 if "clear" in cond.lower() else (
+            ft.Colors.GREY_300 if "cloud" in cond.lower() else ft.Colors.BLUE_200)
+
+        return ft.Container(
+            content=ft.Column(
+                [
+                    ft.Text(name, size=16, weight=ft.FontWeight.BOLD),
+                    icon_store.image(icon, 60, 60),
+                    ft.Text(format_temp(temp, Config.UNITS), size=18, weight=ft.FontWeight.BOLD),
+                    ft.Text(f"Feels like: {format_temp(feels_like, Config.UNITS, symbol=False)}", size=12, color=ft.Colors.GREY_700),
+                    ft.Text(cond, size=14),
+                    ft.Row(
                         [
-                            ft.Text(name, size=16, weight=ft.FontWeight.BOLD),
-                            ft.Image(src=icon_url, width=60, height=60),
-                            ft.Text(f"{temp}°{('C' if Config.UNITS == 'metric' else 'F')}", size=18, weight=ft.FontWeight.BOLD),
-                            ft.Text(f"Feels like: {feels_like}°", size=12, color=ft.Colors.GREY_700),
-                            ft.Text(cond, size=14),
-                            ft.Row(
-                                [
-                                    ft.IconButton(
-                                        icon=ft.Icons.OPEN_IN_NEW,
-                                        tooltip="View details",
-                                        on_click=lambda e, c=name: fetch_weather(c),
-                                        icon_size=20,
-                                    ),
-                                    ft.IconButton(
-                                        icon=ft.Icons.DELETE_OUTLINE,
-                                        tooltip="Remove from watchlist",
-                                        on_click=lambda e, c=name: remove_from_watchlist(c),
-                                        icon_size=20,
-                                    ),
-                                ],
-                                alignment=ft.MainAxisAlignment.CENTER,
+                            ft.IconButton(
+                                icon=ft.Icons.OPEN_IN_NEW,
+                                tooltip="View details",
+                                on_click=lambda e, c=city: fetch_weather(c),
+                                icon_size=20,
                             ),
-                        ],
-                        alignment=ft.MainAxisAlignment.CENTER,
-                        horizontal_alignment=ft.CrossAxisAlignment.CENTER,
-                        spacing=4,
-                    ),
-                    width=160,
-                    height=240,
-                    bgcolor=color if page.theme_mode == ft.ThemeMode.LIGHT else ft.Colors.GREY_800,
-                    border_radius=12,
-                    padding=10,
-                    animate=300,
-                )
-            except Exception as e:
-                return ft.Container(
-                    content=ft.Column(
-                        [
-                            ft.Text(f"{city}", size=14, weight=ft.FontWeight.BOLD),
-                            ft.Icon(ft.Icons.ERROR_OUTLINE, size=40, color=ft.Colors.RED),
-                            ft.Text("Error loading", size=12),
                             ft.IconButton(
                                 icon=ft.Icons.DELETE_OUTLINE,
-                                tooltip="Remove",
+                                tooltip="Remove from watchlist",
                                 on_click=lambda e, c=city: remove_from_watchlist(c),
+                                icon_size=20,
                             ),
                         ],
                         alignment=ft.MainAxisAlignment.CENTER,
-                        horizontal_alignment=ft.CrossAxisAlignment.CENTER,
                     ),
-                    width=160,
-                    height=240,
-                    bgcolor=ft.Colors.RED_100 if page.theme_mode == ft.ThemeMode.LIGHT else ft.Colors.RED_900,
-                    border_radius=12,
-                    padding=10,
-                )
+                ],
+                alignment=ft.MainAxisAlignment.CENTER,
+                horizontal_alignment=ft.CrossAxisAlignment.CENTER,
+                spacing=4,
+            ),
+            width=160,
+            height=240,
+            bgcolor=color if page.theme_mode == ft.ThemeMode.LIGHT else ft.Colors.GREY_800,
+            border_radius=12,
+            padding=10,
+            animate=300,
+        )
+
+    def on_import_picked(e: ft.FilePickerResultEvent):
+        if e.files:
+            run_latest("import", import_watchlist(e.files[0].path))
+
+    async def import_watchlist(path: str):
+        """Add every city in a file, then warm the cache for the new ones
+        in one bounded, rate-limited background batch."""
+        try:
+            added = await asyncio.to_thread(watchlist_service.import_file, path)
+        except ValueError as exc:
+            show_alert(str(exc), "error")
+            return
+        if not added:
+            show_alert("No new cities to import.", "info")
+            return
+        city_index.add(added)
+        show_alert(f"Importing {len(added)} cities...", "info")
+        if watchlist_view["grid"] is not None:
+            run_latest("watchlist", view_watchlist())
+
+        # No batch deadline or per-city timeout: the rate limiter paces a
+        # large import, and waiting in its queue is not a failure. Prefetch
+        # lane, so the watchlist cards on screen are fetched first
+        failed = []
+        results = weather_service.get_weather_many(added, priority=PREFETCH, deadline=0, timeout=0)
+        try:
+            async for result in results:
+                if not result.ok:
+                    failed.append(result.city)
+        finally:
+            await results.aclose()
+
+        # One summary instead of a snackbar per city
+        summary = f"Imported {len(added)} cities: {len(added) - len(failed)} loaded"
+        if failed:
+            names = ", ".join(failed[:3]) + (f" and {len(failed) - 3} more" if len(failed) > 3 else "")
+            show_alert(f"{summary}, {len(failed)} failed ({names})", "warning")
+        else:
+            show_alert(summary, "success")
+
+    def on_export_picked(e: ft.FilePickerResultEvent):
+        if e.path:
+            run_async(export_watchlist(e.path), page.loop)
 
-        results = await asyncio.gather(*(fetch_city(c) for c in cities))
-        watchlist_section.controls.extend([ft.Row(results, wrap=True, spacing=10)])
-        page.update()
+    async def export_watchlist(path: str):
+        try:
+            count = await asyncio.to_thread(watchlist_service.export_file, path)
+        except OSError as exc:
+            show_alert(f"Export failed: {exc}", "error")
+            return
+        show_alert(f"Exported {count} cities to {os.path.basename(path)}", "success")
 
     def clear_watchlist():
         """Clear entire watchlist"""
         watchlist_service.clear_watchlist()
         watchlist_section.controls = []
+        watchlist_view.update(cities=[], grid=None, loading=False, results={})
         show_alert("Watchlist cleared", "success")
-        page.update()
+        ui.mark_dirty()
 
     def remove_from_watchlist(city):
         watchlist_service.remove_city(city)
         show_alert(f"{city} removed from watchlist 🗑️", "info")
-        run_async(view_watchlist())
-
-    async def auto_refresh_loop():
-        """Auto-refresh weather data every 5 minutes"""
-        while auto_refresh_enabled["value"] and current_city["name"]:
-            await asyncio.sleep(300)  # 5 minutes
-            if auto_refresh_enabled["value"] and current_city["name"]:
-                await fetch_and_display(current_city["name"], silent=True)
-                show_alert(f"Weather refreshed for {current_city['name']}", "info")
-
-    def get_weather_emoji(condition: str) -> str:
-        """Get emoji based on weather condition"""
-        condition_lower = condition.lower()
-        if "clear" in condition_lower:
-            return "☀️"
-        elif "cloud" in condition_lower:
-            return "☁️"
-        elif "rain" in condition_lower:
-            return "🌧️"
-        elif "snow" in condition_lower:
-            return "❄️"
-        elif "thunder" in condition_lower or "storm" in condition_lower:
-            return "⛈️"
-        elif "mist" in condition_lower or "fog" in condition_lower:
-            return "🌫️"
-        return "🌤️"
+        run_latest("watchlist", view_watchlist())
+
+    async def refresh_current():
+        """Refresh job for the city on screen. Returns the data's dt."""
+        city = current_city["name"]
+        search = in_flight.get("search")
+        if not city or (search is not None and not search.done()):
+            return None  # never pre-empt a search the user is waiting on
+        shown = last_data["weather"]
+        task = run_latest("search", fetch_and_display(city, silent=True))
+        # wait() rather than await, so stopping this job doesn't cancel the
+        # search, and a newer search cancelling it doesn't stop this job
+        await asyncio.wait({task})
+        if task.cancelled() or task.result() is None:
+            return None
+        data = task.result()
+        # Only tell the user when the provider actually published new data
+        if data.dt and (shown is None or not shown.dt or data.dt > shown.dt):
+            show_alert(f"Weather refreshed for {city}", "info")
+        return data.dt
+
+    async def refresh_watchlist():
+        """Refresh job for the watchlist cards built so far. Only cards whose
+        data is old enough for the provider to have published again are
+        fetched. Returns the newest dt on the cards."""
+        grid = watchlist_view["grid"]
+        if grid is None:
+            return None
+        shown = watchlist_view["results"]
+        cities = watchlist_view["cities"][:len(grid.controls)]
+        slots = {city: i for i, city in enumerate(cities)}
+        due_before = time.time() - Config.PROVIDER_UPDATE_INTERVAL
+        due = [
+            city for city, slot in slots.items()
+            if slot not in shown or not shown[slot].ok or (shown[slot].data.dt or 0) <= due_before
+        ]
+        # force: a cached copy would just be the data already on the cards
+        results = weather_service.get_weather_many(due, priority=BACKGROUND, force=True)
+        try:
+            async for result in results:
+                if result.ok and watchlist_view["grid"] is grid:
+                    show_city_card(grid, slots[result.city], result)
+        finally:
+            await results.aclose()
+        # The newest dt, so one lagging station can't make the whole grid poll
+        # at the minimum interval
+        observed = [r.data.dt for r in shown.values() if r.ok and r.data.dt]
+        return max(observed) if observed else None
 
     async def fetch_and_display(city: str, silent: bool = False):
+        """Show the weather and forecast for a city. Returns the current
+        conditions, or None if they could not be loaded."""
+        # Silent refreshes queue behind the user's own searches
+        priority = BACKGROUND if silent else INTERACTIVE
         if not silent:
             is_loading["value"] = True
             loading_indicator.visible = True
-            weather_card.content.controls = [ft.Text(f"Fetching weather for {city}...", color=ft.Colors.AMBER)]
-            page.update()
-
+            # Show the last saved copy (if any) while fresh data loads
+            cached = await weather_service.peek_weather(city)
+            if cached:
+                render_weather(cached, city)
+            else:
+                weather_card.show_message(f"Fetching weather for {city}...", ft.Colors.AMBER)
+            cached_forecast = await weather_service.peek_forecast(city)
+            if cached_forecast:
+                render_forecast(cached_forecast)
+            ui.mark_dirty()
+
+        # Current weather and forecast are requested at the same time;
+        # silent refreshes skip the cache, which holds what is on screen
+        bundle = weather_service.get_city_bundle(city, priority, force=silent)
         try:
-            data = await weather_service.get_weather(city)
+            data = await bundle.current
+        except asyncio.CancelledError:
+            # Superseded by a newer search: drop the forecast too
+            bundle.cancel()
+            raise
         except WeatherServiceError as exc:
+            bundle.cancel()
             show_alert(str(exc), "error")
             is_loading["value"] = False
             loading_indicator.visible = False
-            page.update()
-            return
+            ui.mark_dirty()
+            return None
         except Exception as exc:
+            bundle.cancel()
             show_alert(f"Unexpected error: {exc}", "error")
             is_loading["value"] = False
             loading_indicator.visible = False
-            page.update()
-            return
+            ui.mark_dirty()
+            return None
 
-        # Extract data
-        name = data.get("name", city)
-        sys = data.get("sys", {})
-        country = sys.get("country", "")
-        main = data.get("main", {})
-        weather = data.get("weather", [{}])[0]
-        wind = data.get("wind", {})
-        coord = data.get("coord", {})
-
-        temp = main.get("temp", "N/A")
-        feels_like = main.get("feels_like", "N/A")
-        temp_min = main.get("temp_min", "N/A")
-        temp_max = main.get("temp_max", "N/A")
-        humidity = main.get("humidity", "N/A")
-        condition = weather.get("description", "N/A").capitalize()
-        wind_speed = wind.get("speed", "N/A")
-        wind_deg = wind.get("deg", "N/A")
-        pressure = main.get("pressure", "N/A")
-        clouds = data.get("clouds", {}).get("all", "N/A")
-        visibility = data.get("visibility", "N/A")
-        icon_code = weather.get("icon", "01d")
-        lat = coord.get("lat", "N/A")
-        lon = coord.get("lon", "N/A")
-        
-        # Get sunrise/sunset
-        sunrise = sys.get("sunrise", None)
-        sunset = sys.get("sunset", None)
-        sunrise_time = datetime.fromtimestamp(sunrise).strftime("%H:%M") if sunrise else "N/A"
-        sunset_time = datetime.fromtimestamp(sunset).strftime("%H:%M") if sunset else "N/A"
+        render_weather(data, city)
+        show_weather_alerts(data)
+
+        is_loading["value"] = False
+        loading_indicator.visible = False
+        ui.mark_dirty()
 
-        icon_url = f"https://openweathermap.org/img/wn/{icon_code}@2x.png"
-        weather_icon = ft.Image(src=icon_url, width=100, height=100)
-        weather_emoji = get_weather_emoji(condition)
+        # Only the user's own searches count towards history ranking
+        if not silent:
+            city_key = weather_service.canonical_key(city)
+            history_service.add_city(city_key)
+            city_index.add([city_key])
 
-        # Store current city
-        current_city["name"] = name
+        # The forecast has been loading alongside; fill it in when it lands
+        try:
+            forecast = await bundle.forecast
+        except Exception:
+            show_alert("Could not load forecast.", "warning")
+            return data
+        render_forecast(forecast)
+        return data
+
+    def show_weather_alerts(data: CurrentConditions):
+        """Show snackbar alerts for extreme conditions."""
+        temp = data.temp
+        condition = data.description
 
-        # --- Weather alerts ---
-        if isinstance(temp, (int, float)):
+        if temp is not None:
             if temp > 35:
-                show_alert(f"🔥 Hot weather alert! {temp}°C", "alert")
+                show_alert(f"🔥 Hot weather alert! {format_temp(temp, Config.UNITS)}", "alert")
             elif temp < 5:
-                show_alert(f"❄️ Cold weather alert! {temp}°C", "alert")
+                show_alert(f"❄️ Cold weather alert! {format_temp(temp, Config.UNITS)}", "alert")
         
         if "storm" in condition.lower() or "thunder" in condition.lower():
             show_alert("⛈️ Storm alert! Stay safe!", "alert")
 
-        # --- Dynamic background gradient ---
-        bg_gradient = ft.LinearGradient(
-            begin=ft.alignment.top_center,
-            end=ft.alignment.bottom_center,
-            colors=(
-                [ft.Colors.LIGHT_BLUE_200, ft.Colors.BLUE_100]
-                if "clear" in condition.lower()
-                else [ft.Colors.GREY_400, ft.Colors.BLUE_GREY_200]
-                if "cloud" in condition.lower()
-                else [ft.Colors.BLUE_GREY_600, ft.Colors.BLUE_GREY_300]
-                if "rain" in condition.lower()
-                else [ft.Colors.INDIGO_200, ft.Colors.BLUE_300]
-            ),
-        )
-
-        weather_card.bgcolor = None
-        weather_card.gradient = bg_gradient
-
-        # Unit symbol
-        unit_symbol = 'C' if Config.UNITS == 'metric' else 'F'
-        speed_unit = 'm/s' if Config.UNITS == 'metric' else 'mph'
-
-        weather_card.content.controls = [
-            ft.Text(f"{weather_emoji} {name}, {country}", size=24, weight=ft.FontWeight.BOLD),
-            ft.Text(f"📍 {lat}, {lon}", size=12, color=ft.Colors.GREY_700),
-            weather_icon,
-            ft.Text(condition, size=18, italic=True),
-            ft.Text(
-                f"{temp}°{unit_symbol}",
-                size=48,
-                weight=ft.FontWeight.BOLD,
-                color=ft.Colors.BLUE_900,
-            ),
-            ft.Text(f"Feels like {feels_like}°{unit_symbol}", size=16, color=ft.Colors.GREY_800),
-            ft.Text(f"Min: {temp_min}° | Max: {temp_max}°", size=14, color=ft.Colors.GREY_700),
-            ft.Divider(height=20),
-            ft.Row(
-                [
-                    ft.Column(
-                        [
-                            ft.Icon(ft.Icons.WATER_DROP, size=20),
-                            ft.Text(f"{humidity}%", size=14, weight=ft.FontWeight.BOLD),
-                            ft.Text("Humidity", size=12),
-                        ],
-                        horizontal_alignment=ft.CrossAxisAlignment.CENTER,
-                    ),
-                    ft.Column(
-                        [
-                            ft.Icon(ft.Icons.AIR, size=20),
-                            ft.Text(f"{wind_speed}", size=14, weight=ft.FontWeight.BOLD),
-                            ft.Text(speed_unit, size=12),
-                        ],
-                        horizontal_alignment=ft.CrossAxisAlignment.CENTER,
-                    ),
-                    ft.Column(
-                        [
-                            ft.Icon(ft.Icons.COMPRESS, size=20),
-                            ft.Text(f"{pressure}", size=14, weight=ft.FontWeight.BOLD),
-                            ft.Text("hPa", size=12),
-                        ],
-                        horizontal_alignment=ft.CrossAxisAlignment.CENTER,
-                    ),
-                    ft.Column(
-                        [
-                            ft.Icon(ft.Icons.CLOUD, size=20),
-                            ft.Text(f"{clouds}%", size=14, weight=ft.FontWeight.BOLD),
-                            ft.Text("Clouds", size=12),
-                        ],
-                        horizontal_alignment=ft.CrossAxisAlignment.CENTER,
-                    ),
-                ],
-                alignment=ft.MainAxisAlignment.SPACE_AROUND,
-            ),
-        ]
-
-        # --- Additional Stats Section ---
-        stats_section.controls = [
-            ft.Container(
-                content=ft.Row(
-                    [
-                        ft.Column(
-                            [
-                                ft.Icon(ft.Icons.VISIBILITY, size=30, color=ft.Colors.BLUE_700),
-                                ft.Text("Visibility", size=14, weight=ft.FontWeight.BOLD),
-                                ft.Text(f"{visibility/1000 if isinstance(visibility, (int, float)) else 'N/A'} km", size=16),
-                            ],
-                            horizontal_alignment=ft.CrossAxisAlignment.CENTER,
-                        ),
-                        ft.VerticalDivider(),
-                        ft.Column(
-                            [
-                                ft.Icon(ft.Icons.EXPLORE, size=30, color=ft.Colors.ORANGE_700),
-                                ft.Text("Wind Direction", size=14, weight=ft.FontWeight.BOLD),
-                                ft.Text(f"{wind_deg}°", size=16),
-                            ],
-                            horizontal_alignment=ft.CrossAxisAlignment.CENTER,
-                        ),
-                        ft.VerticalDivider(),
-                        ft.Column(
-                            [
-                                ft.Icon(ft.Icons.WB_SUNNY, size=30, color=ft.Colors.AMBER_700),
-                                ft.Text("Sunrise", size=14, weight=ft.FontWeight.BOLD),
-                                ft.Text(sunrise_time, size=16),
-                            ],
-                            horizontal_alignment=ft.CrossAxisAlignment.CENTER,
-                        ),
-                        ft.VerticalDivider(),
-                        ft.Column(
-                            [
-                                ft.Icon(ft.Icons.NIGHTS_STAY, size=30, color=ft.Colors.INDIGO_700),
-                                ft.Text("Sunset", size=14, weight=ft.FontWeight.BOLD),
-                                ft.Text(sunset_time, size=16),
-                            ],
-                            horizontal_alignment=ft.CrossAxisAlignment.CENTER,
-                        ),
-                    ],
-                    alignment=ft.MainAxisAlignment.SPACE_AROUND,
-                ),
-                bgcolor=ft.Colors.BLUE_50 if page.theme_mode == ft.ThemeMode.LIGHT else ft.Colors.GREY_900,
-                border_radius=12,
-                padding=15,
-                width=850,
-            )
-        ]
-
-        is_loading["value"] = False
-        loading_indicator.visible = False
-        page.update()
-
-        history_service.add_city(name)
-        run_async(fetch_and_display_forecast(city))
+    def render_weather(data: CurrentConditions, city: str) -> str:
+        """Patch the weather card and stats from parsed conditions.
 
-    async def fetch_and_display_forecast(city: str):
-        try:
-            data = await weather_service.get_forecast(city)
-        except Exception:
-            show_alert("Could not load forecast.", "warning")
-            return
+        Values are in metric; they are converted to Config.UNITS here.
+        """
+        last_data["city"], last_data["weather"] = city, data
+        name = data.name or city
+        # Store current city
+        current_city["name"] = name
+        weather_card.show(data, Config.UNITS, city)
+        return name
 
-        forecast_list = data.get("list", [])
-        if not forecast_list:
+    def render_forecast(data: Forecast):
+        """Fill the forecast section from a parsed (metric) forecast."""
+        last_data["forecast"] = data
+        if not data.points:
             return
 
         forecast_section.controls = [
             ft.Text("📅 5-Day Forecast", size=22, weight=ft.FontWeight.BOLD)
         ]
-        displayed_dates = set()
-
-        for item in forecast_list:
-            dt_txt = item.get("dt_txt", "")
-            date = dt_txt.split(" ")[0]
-            if date in displayed_dates:
-                continue
-            displayed_dates.add(date)
-
-            main = item.get("main", {})
-            weather = item.get("weather", [{}])[0]
-            temp = main.get("temp", "N/A")
-            temp_min = main.get("temp_min", "N/A")
-            temp_max = main.get("temp_max", "N/A")
-            cond = weather.get("description", "N/A").capitalize()
-            icon = weather.get("icon", "01d")
-            icon_url = f"https://openweathermap.org/img/wn/{icon}@2x.png"
+
+        # Imported on first use: NumPy is the slowest import in the app
+        from forecast_aggregator import ForecastFrame
+
+        # True daily summaries over every 3-hour point, in the city's timezone
+        for day in ForecastFrame(data).daily():
+            date = day.date
+            temp = day.temp_mean
+            temp_min = day.temp_min
+            temp_max = day.temp_max
+            cond = day.condition
+            icon = day.icon
 
             # Parse date for better display
             try:
@@ -672,7 +828,7 @@ def main(page: ft.Page):
                 else ft.Colors.INDIGO_100
             )
 
-            unit_symbol = 'C' if Config.UNITS == 'metric' else 'F'
+            units = Config.UNITS
 
             card = ft.Container(
                 width=150,
@@ -683,10 +839,20 @@ def main(page: ft.Page):
                 content=ft.Column(
                     [
                         ft.Text(display_date, size=14, weight=ft.FontWeight.W_600),
-                        ft.Image(src=icon_url, width=60, height=60),
-                        ft.Text(f"{temp}°{unit_symbol}", size=20, weight=ft.FontWeight.BOLD),
-                        ft.Text(f"↓{temp_min}° ↑{temp_max}°", size=12, color=ft.Colors.GREY_700),
+                        icon_store.image(icon, 60, 60),
+                        ft.Text(format_temp(temp, units), size=20, weight=ft.FontWeight.BOLD),
+                        ft.Text(
+                            f"↓{format_temp(temp_min, units, symbol=False)} ↑{format_temp(temp_max, units, symbol=False)}",
+                            size=12,
+                            color=ft.Colors.GREY_700,
+                        ),
                         ft.Text(cond, size=12, italic=True),
+                        ft.Text(
+                            f"💧 {day.precip_total:.1f} mm · {day.pop_max:.0%}",
+                            size=11,
+                            color=ft.Colors.GREY_700,
+                            visible=day.pop_max > 0 or day.precip_total > 0,
+                        ),
                     ],
                     alignment=ft.MainAxisAlignment.CENTER,
                     horizontal_alignment=ft.CrossAxisAlignment.CENTER,
@@ -703,16 +869,68 @@ def main(page: ft.Page):
             )
         )
         forecast_section.controls = forecast_section.controls[:1] + [forecast_section.controls[-1]]
-        page.update()
+        ui.mark_dirty()
 
     def fetch_weather(city=None):
         city_name = (city or city_input.value or "").strip()
         if not city_name:
             show_alert("Please enter a city name.", "warning")
             return
-        run_async(fetch_and_display(city_name))
+        hide_suggestions()
+        run_latest("search", fetch_and_display(city_name))
+
+    async def prefetch_hot():
+        """Warm the cache for the most-searched cities (weather and
+        forecast) and the watchlist, in the prefetch lane so searches and
+        the watchlist view always go first. Returns the oldest dt fetched."""
+        top = history_service.top_cities(Config.PREFETCH_TOP_K)
+        cities = list(dict.fromkeys(top + watchlist_service.get_watchlist()))[:Config.PREFETCH_LIMIT]
+        if not cities:
+            return None
+        # Hot cities are usually opened in full, so their forecast too
+        forecasts = [asyncio.ensure_future(weather_service.get_forecast(c, PREFETCH)) for c in top]
+        observed = []
+        results = weather_service.get_weather_many(cities, priority=PREFETCH, deadline=0, timeout=0)
+        try:
+            async for result in results:
+                if result.ok and result.data.dt:
+                    observed.append(result.data.dt)
+            await asyncio.gather(*forecasts, return_exceptions=True)
+        finally:
+            await results.aclose()
+            for task in forecasts:
+                task.cancel()
+        return min(observed) if observed else None
+
+    # ---------- STARTUP ----------
+    async def startup():
+        """Everything the first frame doesn't need, in the background."""
+        # Saved searches and watchlist, read off the loop
+        await asyncio.gather(
+            asyncio.to_thread(history_service.load),
+            asyncio.to_thread(watchlist_service.load),
+        )
+        # Autocomplete: the user's own cities now, the bundled list in the background
+        city_index.add(history_service.get_history() + watchlist_service.get_watchlist())
+        run_async(asyncio.to_thread(city_index.load, Config.CITY_LIST_FILE), page.loop)
+        run_async(icon_store.prefetch(), page.loop)
+        # One pooled HTTP client for the whole page session (loads .env first)
+        try:
+            await weather_service.start()
+        except WeatherServiceError as e:
+            weather_card.show_message(str(e), ft.Colors.RED_400)
+            ui.mark_dirty()
+            return
+        # Load saved data for known cities so they render without waiting on the network
+        await weather_service.warm_from_disk(
+            history_service.get_history(Config.HISTORY_WARM_SIZE) + watchlist_service.get_watchlist()
+        )
+        # Then fetch the cities most likely to be opened next
+        await prefetch_hot()
 
+    # First frame before any disk or network work
     page.update()
+    run_async(startup(), page.loop)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,221 @@
+# models.py
+"""Typed weather data, parsed and validated once per API response.
+
+All values are in the canonical (metric) units the service fetches in;
+convert with the helpers in units.py for display. Missing numbers are None.
+"""
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+
+
+class ParseError(ValueError):
+    """Raised when an API payload does not have the expected shape."""
+    pass
+
+
+def _num(value) -> Optional[float]:
+    return value if isinstance(value, (int, float)) and not isinstance(value, bool) else None
+
+
+def _first_weather(item: Dict) -> Dict:
+    weather = item.get("weather") or [{}]
+    return weather[0] if isinstance(weather, list) and isinstance(weather[0], dict) else {}
+
+
+@dataclass(frozen=True)
+class CurrentConditions:
+    """Current weather for one city (from the /weather endpoint)."""
+
+    __slots__ = (
+        "city_id", "name", "country", "lat", "lon", "dt", "timezone",
+        "temp", "feels_like", "temp_min", "temp_max", "humidity", "pressure",
+        "condition_id", "main", "description", "icon",
+        "wind_speed", "wind_deg", "clouds", "visibility", "sunrise", "sunset",
+    )
+
+    city_id: Optional[int]
+    name: str
+    country: str
+    lat: Optional[float]
+    lon: Optional[float]
+    dt: Optional[int]
+    timezone: int
+    temp: Optional[float]
+    feels_like: Optional[float]
+    temp_min: Optional[float]
+    temp_max: Optional[float]
+    humidity: Optional[float]
+    pressure: Optional[float]
+    condition_id: Optional[int]
+    main: str
+    description: str
+    icon: str
+    wind_speed: Optional[float]
+    wind_deg: Optional[float]
+    clouds: Optional[float]
+    visibility: Optional[float]
+    sunrise: Optional[int]
+    sunset: Optional[int]
+
+    @classmethod
+    def from_payload(cls, data: Dict, fallback_name: str = "") -> "CurrentConditions":
+        if not isinstance(data, dict) or not isinstance(data.get("main"), dict):
+            raise ParseError("Weather payload has no 'main' section.")
+        main = data["main"]
+        weather = _first_weather(data)
+        sys = data.get("sys") or {}
+        coord = data.get("coord") or {}
+        wind = data.get("wind") or {}
+        return cls(
+            city_id=data.get("id"),
+            name=data.get("name") or fallback_name,
+            country=sys.get("country", ""),
+            lat=_num(coord.get("lat")),
+            lon=_num(coord.get("lon")),
+            dt=data.get("dt"),
+            timezone=data.get("timezone") or 0,
+            temp=_num(main.get("temp")),
+            feels_like=_num(main.get("feels_like")),
+            temp_min=_num(main.get("temp_min")),
+            temp_max=_num(main.get("temp_max")),
+            humidity=_num(main.get("humidity")),
+            pressure=_num(main.get("pressure")),
+            condition_id=weather.get("id"),
+            main=weather.get("main", ""),
+            description=weather.get("description", "N/A"),
+            icon=weather.get("icon", "01d"),
+            wind_speed=_num(wind.get("speed")),
+            wind_deg=_num(wind.get("deg")),
+            clouds=_num((data.get("clouds") or {}).get("all")),
+            visibility=_num(data.get("visibility")),
+            sunrise=sys.get("sunrise"),
+            sunset=sys.get("sunset"),
+        )
+
+    @property
+    def condition(self) -> str:
+        """Description for display, e.g. "Light rain"."""
+        return self.description.capitalize()
+
+
+@dataclass(frozen=True)
+class ForecastPoint:
+    """One 3-hour step of the 5-day forecast."""
+
+    __slots__ = (
+        "dt", "temp", "temp_min", "temp_max", "humidity",
+        "condition_id", "main", "description", "icon",
+        "pop", "rain", "snow", "wind_speed",
+    )
+
+    dt: int
+    temp: Optional[float]
+    temp_min: Optional[float]
+    temp_max: Optional[float]
+    humidity: Optional[float]
+    condition_id: Optional[int]
+    main: str
+    description: str
+    icon: str
+    pop: float  # probability of precipitation, 0..1
+    rain: float  # mm in the 3 hours
+    snow: float  # mm in the 3 hours
+    wind_speed: Optional[float]
+
+    @classmethod
+    def from_payload(cls, item: Dict) -> "ForecastPoint":
+        if not isinstance(item, dict) or not isinstance(item.get("dt"), int):
+            raise ParseError("Forecast entry has no 'dt' timestamp.")
+        main = item.get("main") or {}
+        weather = _first_weather(item)
+        return cls(
+            dt=item["dt"],
+            temp=_num(main.get("temp")),
+            temp_min=_num(main.get("temp_min")),
+            temp_max=_num(main.get("temp_max")),
+            humidity=_num(main.get("humidity")),
+            condition_id=weather.get("id"),
+            main=weather.get("main", ""),
+            description=weather.get("description", "N/A"),
+            icon=weather.get("icon", "01d"),
+            pop=_num(item.get("pop")) or 0.0,
+            rain=_num((item.get("rain") or {}).get("3h")) or 0.0,
+            snow=_num((item.get("snow") or {}).get("3h")) or 0.0,
+            wind_speed=_num((item.get("wind") or {}).get("speed")),
+        )
+
+    @property
+    def condition(self) -> str:
+        return self.description.capitalize()
+
+    @property
+    def date(self) -> str:
+        """UTC date as "YYYY-MM-DD" (the same as the API's dt_txt)."""
+        return datetime.fromtimestamp(self.dt, tz=timezone.utc).strftime("%Y-%m-%d")
+
+
+@dataclass(frozen=True)
+class Forecast:
+    """The 5-day / 3-hour forecast for one city."""
+
+    __slots__ = ("city_id", "name", "country", "timezone", "points")
+
+    city_id: Optional[int]
+    name: str
+    country: str
+    timezone: int  # seconds east of UTC
+    points: Tuple[ForecastPoint, ...]
+
+    @classmethod
+    def from_payload(cls, data: Dict, fallback_name: str = "") -> "Forecast":
+        if not isinstance(data, dict) or not isinstance(data.get("list"), list):
+            raise ParseError("Forecast payload has no 'list' section.")
+        city = data.get("city") or {}
+        points = tuple(sorted(
+            (ForecastPoint.from_payload(item) for item in data["list"]),
+            key=lambda p: p.dt,
+        ))
+        return cls(
+            city_id=city.get("id"),
+            name=city.get("name") or fallback_name,
+            country=city.get("country", ""),
+            timezone=city.get("timezone") or 0,
+            points=points,
+        )
+
+
+@dataclass(frozen=True)
+class DailySummary:
+    """One local day of the forecast, aggregated from its 3-hour points."""
+
+    __slots__ = (
+        "date", "temp_min", "temp_max", "temp_mean", "humidity_max",
+        "precip_total", "pop_max", "condition_id", "main", "description",
+        "icon", "samples",
+    )
+
+    date: str  # "YYYY-MM-DD" in the city's local time
+    temp_min: Optional[float]
+    temp_max: Optional[float]
+    temp_mean: Optional[float]
+    humidity_max: Optional[float]
+    precip_total: float  # mm of rain + snow over the day
+    pop_max: float  # highest probability of precipitation, 0..1
+    condition_id: Optional[int]  # most frequent condition of the day
+    main: str
+    description: str
+    icon: str
+    samples: int  # number of 3-hour points in the day
+
+    @property
+    def condition(self) -> str:
+        return self.description.capitalize()
+
+
+PARSERS = {"weather": CurrentConditions, "forecast": Forecast}
+
+
+def parse_payload(endpoint: str, data: Dict, fallback_name: str = ""):
+    """Parse a raw payload from the given endpoint into its model."""
+    return PARSERS[endpoint].from_payload(data, fallback_name)
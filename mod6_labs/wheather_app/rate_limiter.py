@@ -0,0 +1,126 @@
+# rate_limiter.py
+import asyncio
+import time
+from collections import deque
+from typing import Deque, Dict, Optional
+
+# Priority lanes (lower number is served first)
+INTERACTIVE = 0
+BACKGROUND = 1
+PREFETCH = 2  # speculative cache warming; yields to anything on screen
+LANE_NAMES = {INTERACTIVE: "interactive", BACKGROUND: "background", PREFETCH: "prefetch"}
+
+
+class Ticket:
+    """A place in the limiter queue. Can be promoted while it waits."""
+
+    __slots__ = ("priority", "future", "enqueued_at")
+
+    def __init__(self, priority: int = BACKGROUND):
+        self.priority = priority
+        self.future: Optional[asyncio.Future] = None
+        self.enqueued_at = 0.0
+
+
+class RateLimiter:
+    """Token bucket limiter with priority lanes.
+
+    Tokens refill at ``calls / period`` per second up to ``burst``. When
+    the bucket is empty, callers queue in their priority lane and the
+    interactive lane is always served before the background lane.
+    """
+
+    def __init__(self, calls: int = 60, period: float = 60, burst: int = 10):
+        self.capacity = max(1, burst)
+        self.fill_rate = calls / period
+        self.tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lanes: Dict[int, Deque[Ticket]] = {lane: deque() for lane in LANE_NAMES}
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+        # Metrics per lane
+        self._acquired = {lane: 0 for lane in LANE_NAMES}
+        self._wait_total = {lane: 0.0 for lane in LANE_NAMES}
+        self._wait_max = {lane: 0.0 for lane in LANE_NAMES}
+
+    async def acquire(self, priority: int = BACKGROUND, ticket: Optional[Ticket] = None):
+        """Wait for a token. Pass a ticket to be able to promote it later."""
+        ticket = ticket or Ticket(priority)
+        self._refill()
+        if self.tokens >= 1 and not self.queue_depth():
+            self.tokens -= 1
+            self._record(ticket.priority, 0.0)
+            return
+
+        loop = asyncio.get_running_loop()
+        ticket.future = loop.create_future()
+        ticket.enqueued_at = time.monotonic()
+        self._lanes[ticket.priority].append(ticket)
+        self._dispatch()
+        try:
+            await ticket.future
+        except asyncio.CancelledError:
+            if ticket in self._lanes[ticket.priority]:
+                self._lanes[ticket.priority].remove(ticket)
+            elif ticket.future.done() and not ticket.future.cancelled():
+                self.tokens += 1  # granted just as we gave up; hand it back
+                self._dispatch()
+            raise
+        self._record(ticket.priority, time.monotonic() - ticket.enqueued_at)
+
+    def promote(self, ticket: Ticket, priority: int):
+        """Move a waiting ticket to a higher priority lane."""
+        if priority >= ticket.priority:
+            return
+        lane = self._lanes[ticket.priority]
+        if ticket in lane:
+            lane.remove(ticket)
+            self._lanes[priority].append(ticket)
+        ticket.priority = priority
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.fill_rate)
+        self._updated = now
+
+    def _dispatch(self):
+        """Hand out available tokens, highest priority lane first."""
+        self._timer = None
+        self._refill()
+        for lane in sorted(self._lanes):
+            queue = self._lanes[lane]
+            while queue and self.tokens >= 1:
+                ticket = queue.popleft()
+                if ticket.future.done():
+                    continue
+                self.tokens -= 1
+                ticket.future.set_result(None)
+        if self.queue_depth() and self._timer is None:
+            delay = (1 - self.tokens) / self.fill_rate
+            self._timer = asyncio.get_running_loop().call_later(delay, self._dispatch)
+
+    def _record(self, lane: int, waited: float):
+        self._acquired[lane] += 1
+        self._wait_total[lane] += waited
+        self._wait_max[lane] = max(self._wait_max[lane], waited)
+
+    def queue_depth(self, priority: Optional[int] = None) -> int:
+        """Number of callers waiting, in one lane or in all of them."""
+        if priority is not None:
+            return len(self._lanes[priority])
+        return sum(len(queue) for queue in self._lanes.values())
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Queue depth and wait-time metrics per lane."""
+        self._refill()
+        stats = {"tokens": {"available": round(self.tokens, 2)}}
+        for lane, name in LANE_NAMES.items():
+            acquired = self._acquired[lane]
+            stats[name] = {
+                "queue_depth": len(self._lanes[lane]),
+                "acquired": acquired,
+                "wait_total": round(self._wait_total[lane], 3),
+                "wait_max": round(self._wait_max[lane], 3),
+                "wait_avg": round(self._wait_total[lane] / acquired, 3) if acquired else 0.0,
+            }
+        return stats
@@ -0,0 +1,135 @@
+# refresh_scheduler.py
+import asyncio
+import random
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+
+# A refresh job returns the observation time (payload "dt") of the data it
+# got, or None if it has nothing to report
+RefreshJob = Callable[[], Awaitable[Optional[int]]]
+
+
+class RefreshScheduler:
+    """Owns every periodic refresh in the app, one task per key.
+
+    Scheduling a key that is already running replaces its task, so a job can
+    never run twice. The next run is timed from the data's own timestamp:
+    OpenWeatherMap publishes new conditions about every ``publish_interval``
+    seconds, so polling before ``dt + publish_interval`` would only return
+    what is already on screen. If a run finds the same dt as the one
+    before (the provider hasn't published yet, or its dt lags), the delay
+    doubles on each such run, up to ``max_interval``. Each delay gets random
+    jitter so jobs started together drift apart instead of firing at once.
+    """
+
+    def __init__(
+        self,
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+        interval: float = 300,
+        publish_interval: float = 600,
+        min_interval: float = 60,
+        max_interval: float = 1800,
+        jitter: float = 0.1,
+    ):
+        self.loop = loop
+        self.interval = interval
+        self.publish_interval = publish_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.jitter = jitter
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self.runs = 0
+        self.failures = 0
+
+    def schedule(self, key: str, refresh: RefreshJob, observed: Optional[int] = None):
+        """Run ``refresh`` periodically under ``key``, replacing any job
+        already scheduled there. ``observed`` is the dt of the data shown
+        now, used to time the first run. Safe to call from any thread."""
+        if self._on_loop():
+            self._start(key, refresh, observed)
+        else:
+            self.loop.call_soon_threadsafe(self._start, key, refresh, observed)
+
+    def cancel(self, key: str):
+        """Stop the job under ``key``, if any. Safe to call from any thread."""
+        if self._on_loop():
+            self._stop(key)
+        else:
+            self.loop.call_soon_threadsafe(self._stop, key)
+
+    def cancel_all(self):
+        for key in list(self._tasks):
+            self.cancel(key)
+
+    async def aclose(self):
+        """Cancel every job and wait for them to finish."""
+        tasks = list(self._tasks.values())
+        self._tasks.clear()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def is_scheduled(self, key: str) -> bool:
+        return key in self._tasks
+
+    def keys(self) -> List[str]:
+        return list(self._tasks)
+
+    def _on_loop(self) -> bool:
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            return self.loop is None
+        return self.loop is None or running is self.loop
+
+    def _start(self, key: str, refresh: RefreshJob, observed: Optional[int]):
+        self._stop(key)
+        task = asyncio.get_running_loop().create_task(self._run(key, refresh, observed))
+        self._tasks[key] = task
+        task.add_done_callback(lambda t: self._forget(key, t))
+
+    def _stop(self, key: str):
+        task = self._tasks.pop(key, None)
+        if task is not None:
+            task.cancel()
+
+    def _forget(self, key: str, task: asyncio.Task):
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+
+    async def _run(self, key: str, refresh: RefreshJob, observed: Optional[int]):
+        delay = self.next_delay(observed)
+        stalled = 0  # runs in a row that found no newer data
+        while True:
+            await asyncio.sleep(delay)
+            self.runs += 1
+            try:
+                latest = await refresh()
+            except Exception as e:
+                self.failures += 1
+                print(f"Refresh failed for {key}: {e}")
+                latest = None
+            if latest and observed and latest <= observed:
+                stalled += 1
+            else:
+                stalled = 0
+            observed = latest or observed
+            delay = self.next_delay(latest, stalled)
+
+    # ---------- TIMING ----------
+    def next_delay(self, observed: Optional[int] = None, stalled: int = 0) -> float:
+        """Seconds until the next run, with jitter.
+
+        With an observation time, wait until the provider should have
+        published the next update; otherwise use the fixed interval.
+        ``stalled`` runs in a row without newer data double the delay each.
+        """
+        if observed:
+            delay = observed + self.publish_interval - time.time()
+        else:
+            delay = self.interval
+        delay = max(self.min_interval, delay)
+        if stalled:
+            delay = max(delay, self.min_interval * 2 ** stalled)
+        delay = min(self.max_interval, delay)
+        return delay * random.uniform(1 - self.jitter, 1 + self.jitter)
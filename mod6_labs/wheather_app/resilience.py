@@ -0,0 +1,101 @@
+# resilience.py
+import random
+import time
+from collections import deque
+from typing import Deque, Dict, Optional
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter for idempotent requests."""
+
+    def __init__(self, max_retries: int = 2, base_delay: float = 0.5, max_delay: float = 8):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Seconds to wait before retry number ``attempt`` (0-based).
+
+        A server-provided Retry-After is honoured, capped at ``max_delay``.
+        """
+        backoff = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+        if retry_after is not None:
+            backoff = max(backoff, min(retry_after, self.max_delay))
+        return backoff
+
+
+class CircuitBreaker:
+    """Stops calling the API while its recent error rate is too high.
+
+    CLOSED: calls go through and outcomes are recorded in a sliding window.
+    OPEN: calls are refused until ``reset_timeout`` seconds have passed.
+    HALF_OPEN: one probe call is let through; success closes the circuit,
+    failure opens it again.
+    """
+
+    def __init__(
+        self,
+        window: int = 20,
+        min_calls: int = 5,
+        failure_rate: float = 0.5,
+        reset_timeout: float = 30,
+    ):
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self._outcomes: Deque[bool] = deque(maxlen=window)  # True = failure
+        self._opened_at = 0.0
+        self._probe_at = 0.0
+        self.rejected = 0
+
+    def allow(self) -> bool:
+        """Return True if a call may be made now."""
+        if self.state == CLOSED:
+            return True
+        now = time.monotonic()
+        if self.state == OPEN and now - self._opened_at >= self.reset_timeout:
+            self.state = HALF_OPEN
+            self._probe_at = 0.0
+        if self.state == HALF_OPEN and now - self._probe_at >= self.reset_timeout:
+            # Let one probe through; another is allowed only if this one
+            # never reports back within reset_timeout
+            self._probe_at = now
+            return True
+        self.rejected += 1
+        return False
+
+    def record_success(self):
+        if self.state != CLOSED:
+            self.state = CLOSED
+            self._outcomes.clear()
+        self._outcomes.append(False)
+
+    def record_failure(self):
+        if self.state == HALF_OPEN:
+            self._trip()
+            return
+        self._outcomes.append(True)
+        if len(self._outcomes) >= self.min_calls and self.error_rate() >= self.failure_rate:
+            self._trip()
+
+    def _trip(self):
+        self.state = OPEN
+        self._opened_at = time.monotonic()
+
+    def error_rate(self) -> float:
+        if not self._outcomes:
+            return 0.0
+        return sum(self._outcomes) / len(self._outcomes)
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "state": self.state,
+            "error_rate": round(self.error_rate(), 3),
+            "recent_calls": len(self._outcomes),
+            "rejected": self.rejected,
+        }
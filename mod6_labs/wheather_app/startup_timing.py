@@ -0,0 +1,148 @@
+# startup_timing.py
+"""Cold-start timing report for the Weather App, run headless.
+
+Measures three phases and checks each against its budget in Config:
+
+- import:      importing main and everything it pulls in
+- services:    building the services and loading their saved data
+- first paint: from main(page) to the first frame sent to the client
+
+main() runs against a real ft.Page whose connection just records the
+commands instead of sending them, so no window or network is needed.
+Everything runs in a temp folder holding copies of the saved history and
+watchlist, so the report never changes the user's data.
+Exits with status 1 if a budget is exceeded or a deferred module (NumPy,
+dotenv) was imported before the first frame.
+
+Usage: python startup_timing.py
+"""
+
+import asyncio
+import atexit
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+_start = time.perf_counter()
+import main as app  # noqa: E402  (timed on purpose)
+IMPORT_TIME = time.perf_counter() - _start
+
+import flet as ft  # noqa: E402
+from flet.core.local_connection import LocalConnection  # noqa: E402
+from flet.core.protocol import (  # noqa: E402
+    PageCommandResponsePayload,
+    PageCommandsBatchResponsePayload,
+)
+
+from config import Config  # noqa: E402
+from history_service import HISTORY_FILE, LEGACY_HISTORY_FILE, HistoryService  # noqa: E402
+from watchlist_service import WATCHLIST_FILE, WatchlistService  # noqa: E402
+from weather_service import WeatherService  # noqa: E402
+
+# Modules startup defers until after the first frame
+DEFERRED_MODULES = ("numpy", "forecast_aggregator", "dotenv")
+
+
+class RecordingConnection(LocalConnection):
+    """A Flet connection that keeps the commands instead of sending them,
+    and notes when the first controls are added (the first frame)."""
+
+    def __init__(self):
+        super().__init__()
+        self.commands = 0
+        self.first_paint: float = 0.0
+        self.loaded_at_paint = set()
+
+    def send_command(self, session_id: str, command):
+        result, _ = self._process_command(command)
+        return PageCommandResponsePayload(result=result, error="")
+
+    def send_commands(self, session_id: str, commands):
+        results = []
+        for command in commands:
+            result, _ = self._process_command(command)
+            if command.name in ["add", "get"]:
+                results.append(result)
+            if command.name == "add" and not self.first_paint:
+                self.first_paint = time.perf_counter()
+                self.loaded_at_paint = {m for m in DEFERRED_MODULES if m in sys.modules}
+        self.commands += len(commands)
+        return PageCommandsBatchResponsePayload(results=results, error="")
+
+
+def copy_saved_data(source: str, folder: str) -> str:
+    """Copy the saved data files from ``source`` into ``folder``, so loading
+    them (including migrating an old history file) only touches copies."""
+    os.makedirs(folder, exist_ok=True)
+    for name in (HISTORY_FILE, LEGACY_HISTORY_FILE, WATCHLIST_FILE):
+        path = os.path.join(source, name)
+        if os.path.exists(path):
+            shutil.copy2(path, os.path.join(folder, name))
+    return folder
+
+
+def time_services(folder: str) -> float:
+    """Build the services and load saved data, as startup() does."""
+    start = time.perf_counter()
+    history = HistoryService(os.path.join(folder, HISTORY_FILE))
+    watchlist = WatchlistService(os.path.join(folder, WATCHLIST_FILE))
+    WeatherService()
+    history.load()
+    watchlist.load()
+    elapsed = time.perf_counter() - start
+    # Let any compaction finish before the folder is removed
+    history.flush()
+    return elapsed
+
+
+async def time_first_paint() -> RecordingConnection:
+    loop = asyncio.get_running_loop()
+    conn = RecordingConnection()
+    page = ft.Page(conn, "startup-timing", loop)
+    start = time.perf_counter()
+    # Flet runs a sync main() in a worker thread
+    await asyncio.to_thread(app.main, page)
+    conn.first_paint = conn.first_paint - start if conn.first_paint else float("inf")
+    # Stop the background startup work; only the first frame is measured
+    tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    return conn
+
+
+def main() -> int:
+    home = os.getcwd()
+    folder = tempfile.mkdtemp(prefix="weather-startup-")
+    # Registered first so it runs last, after the services' exit flushes
+    atexit.register(shutil.rmtree, folder, True)
+    # main() uses paths relative to the working directory, and its
+    # background writes may still run at exit, so stay in the sandbox
+    os.chdir(copy_saved_data(home, os.path.join(folder, "app")))
+    # Measured before main() so the first-paint check sees a cold app
+    conn = asyncio.run(time_first_paint())
+    services = time_services(copy_saved_data(home, os.path.join(folder, "services")))
+
+    rows = [
+        ("import", IMPORT_TIME, Config.STARTUP_IMPORT_BUDGET),
+        ("services", services, Config.STARTUP_SERVICES_BUDGET),
+        ("first paint", conn.first_paint, Config.STARTUP_FIRST_PAINT_BUDGET),
+    ]
+    failed = False
+    print("Startup timing")
+    for name, seconds, budget in rows:
+        ok = seconds <= budget
+        failed = failed or not ok
+        print(f"  {name:<12} {seconds * 1000:8.1f} ms  (budget {budget * 1000:.0f} ms)  {'ok' if ok else 'OVER'}")
+    print(f"  commands sent: {conn.commands}")
+    if conn.loaded_at_paint:
+        failed = True
+        print(f"  imported before first paint: {', '.join(sorted(conn.loaded_at_paint))}")
+    print("PASS" if not failed else "FAIL")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,23 @@
+# storage.py
+"""Helpers for saving the app's data files safely."""
+import os
+from typing import Union
+
+
+def atomic_write(path: str, data: Union[str, bytes]):
+    """Replace a file's contents (text or bytes) in one step.
+
+    The data goes to a temp file first, which is then renamed over the
+    original, so a crash mid-write leaves the old file intact instead of
+    half a new one. Blocking; run off the UI loop.
+    """
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    tmp_path = path + ".tmp"
+    mode, encoding = ("wb", None) if isinstance(data, bytes) else ("w", "utf-8")
+    with open(tmp_path, mode, encoding=encoding) as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
@@ -2,6 +2,18 @@
 """Simple tests for weather service."""
 
 import asyncio
+import os
+import tempfile
+import time
+import httpx
+from cache_service import DiskCache
+from city_resolver import CityResolver
+from forecast_aggregator import ForecastFrame
+from history_service import HistoryService
+from models import Forecast
+from rate_limiter import BACKGROUND, INTERACTIVE, RateLimiter, Ticket
+from resilience import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from watchlist_service import _parse_csv
 from weather_service import WeatherService, WeatherServiceError
 
 
@@ -10,8 +22,8 @@ async def test_valid_city():
     service = WeatherService()
     try:
         data = await service.get_weather("London")
-        print(f"✅ Successfully fetched weather for {data['name']}")
-        print(f"   Temperature: {data['main']['temp']}°C")
+        print(f"✅ Successfully fetched weather for {data.name}")
+        print(f"   Temperature: {data.temp}°C")
         return True
     except Exception as e:
         print(f"❌ Test failed: {e}")
@@ -42,6 +54,197 @@ async def test_empty_city():
         return True
 
 
+async def test_cache_hit():
+    """Test that a repeated lookup is served from the cache."""
+    # An empty disk cache, so a payload saved by an earlier run can't
+    # serve the first lookup
+    folder = tempfile.mkdtemp()
+    service = WeatherService(disk_cache=DiskCache(os.path.join(folder, "cache.db")))
+    try:
+        await service.get_weather("London")
+        await service.get_weather("  london ")
+        stats = service.cache_stats()
+        if stats["hits"] == 1 and stats["misses"] == 1:
+            print(f"✅ Second lookup served from cache: {stats}")
+            return True
+        print(f"❌ Expected one hit and one miss, got {stats}")
+        return False
+    except Exception as e:
+        print(f"❌ Test failed: {e}")
+        return False
+    finally:
+        await service.aclose()
+
+
+async def test_weather_many():
+    """Test batch fetching with one bad city in the list."""
+    service = WeatherService()
+    try:
+        results = [r async for r in service.get_weather_many(
+            ["London", "Tokyo", "InvalidCityXYZ123"], concurrency=2
+        )]
+        ok = [r.city for r in results if r.ok]
+        failed = [r.city for r in results if not r.ok]
+        if sorted(ok) == ["London", "Tokyo"] and failed == ["InvalidCityXYZ123"]:
+            print(f"✅ Batch returned {len(ok)} results and {len(failed)} error")
+            return True
+        print(f"❌ Unexpected batch results: ok={ok}, failed={failed}")
+        return False
+    finally:
+        await service.aclose()
+
+
+# ---------- OFFLINE TESTS (no API key or network needed) ----------
+def test_daily_local_timezone():
+    """Test that daily min/max are split at the city's local midnight."""
+    # UTC+9: 15:00 UTC is midnight local time
+    points = [
+        {"dt": 1704110400, "main": {"temp": 10, "temp_min": 9, "temp_max": 11}},  # Jan 1 21:00 local
+        {"dt": 1704121200, "main": {"temp": 2, "temp_min": 1, "temp_max": 3}},  # Jan 2 00:00 local
+        {"dt": 1704132000, "main": {"temp": 4, "temp_min": 4, "temp_max": 6}},  # Jan 2 03:00 local
+    ]
+    forecast = Forecast.from_payload({"list": points, "city": {"timezone": 9 * 3600}})
+    days = [(d.date, d.temp_min, d.temp_max) for d in ForecastFrame(forecast).daily()]
+    expected = [("2024-01-01", 9.0, 11.0), ("2024-01-02", 1.0, 6.0)]
+    if days == expected:
+        print(f"✅ Daily summaries follow local days: {days}")
+        return True
+    print(f"❌ Expected {expected}, got {days}")
+    return False
+
+
+def offline_service(handler) -> WeatherService:
+    """A WeatherService whose requests go to ``handler`` instead of the
+    network, with its cache files in a temp folder."""
+    folder = tempfile.mkdtemp()
+    service = WeatherService(
+        disk_cache=DiskCache(os.path.join(folder, "cache.db")),
+        resolver=CityResolver(os.path.join(folder, "city_index.json")),
+    )
+    service._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return service
+
+
+def weather_payload(name: str, city_id: int) -> dict:
+    return {"id": city_id, "name": name, "sys": {"country": "NO"}, "main": {"temp": 5}, "dt": 1}
+
+
+async def test_single_flight():
+    """Test that identical concurrent lookups share one request, and that
+    one caller giving up doesn't cancel it for the others."""
+    calls = []
+
+    async def handler(request):
+        calls.append(request.url.params.get("q"))
+        await asyncio.sleep(0.05)
+        name = request.url.params.get("q")
+        return httpx.Response(200, json=weather_payload(name, len(calls)))
+
+    service = offline_service(handler)
+    try:
+        shared = await asyncio.gather(*(service.get_weather("Oslo") for _ in range(3)))
+        quitter = asyncio.create_task(service.get_weather("Bergen"))
+        stayer = asyncio.create_task(service.get_weather("Bergen"))
+        await asyncio.sleep(0.01)
+        quitter.cancel()
+        kept = await stayer
+        ok = (
+            calls == ["Oslo", "Bergen"]
+            and all(data.name == "Oslo" for data in shared)
+            and kept.name == "Bergen"
+            and quitter.cancelled()
+        )
+        if ok:
+            print(f"✅ Shared calls: {calls}, coalesced {service.cache_stats()['coalesced']}")
+            return True
+        print(f"❌ Unexpected calls {calls} or results")
+        return False
+    finally:
+        await service.aclose()
+
+
+async def test_rate_limiter_lanes():
+    """Test that the interactive lane is served first, that a promoted
+    ticket jumps the background queue, and that a cancelled wait is
+    dropped without using a token."""
+    limiter = RateLimiter(calls=20, period=1, burst=1)
+    await limiter.acquire()  # empty the bucket so the rest must queue
+    order = []
+
+    async def take(name, ticket):
+        await limiter.acquire(ticket=ticket)
+        order.append(name)
+
+    promoted = Ticket(BACKGROUND)
+    tasks = [
+        asyncio.create_task(take("background", Ticket(BACKGROUND))),
+        asyncio.create_task(take("promoted", promoted)),
+        asyncio.create_task(take("gave up", Ticket(BACKGROUND))),
+        asyncio.create_task(take("interactive", Ticket(INTERACTIVE))),
+    ]
+    await asyncio.sleep(0)  # let every task join its queue
+    limiter.promote(promoted, INTERACTIVE)
+    tasks[2].cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    expected = ["interactive", "promoted", "background"]
+    if order == expected and not limiter.queue_depth():
+        print(f"✅ Tokens handed out in order: {order}")
+        return True
+    print(f"❌ Expected {expected}, got {order}")
+    return False
+
+
+def test_circuit_breaker_cycle():
+    """Test closed -> open -> half-open -> open -> half-open -> closed."""
+    breaker = CircuitBreaker(window=4, min_calls=2, failure_rate=0.5, reset_timeout=0.05)
+    steps = []
+    breaker.record_failure()
+    breaker.record_failure()
+    steps.append((breaker.state, breaker.allow()))  # tripped: calls refused
+    time.sleep(0.06)
+    steps.append((breaker.allow(), breaker.state, breaker.allow()))  # one probe only
+    breaker.record_failure()  # probe failed
+    steps.append((breaker.state, breaker.allow()))
+    time.sleep(0.06)
+    breaker.allow()
+    breaker.record_success()  # probe succeeded
+    steps.append((breaker.state, breaker.allow()))
+    expected = [(OPEN, False), (True, HALF_OPEN, False), (OPEN, False), (CLOSED, True)]
+    if steps == expected:
+        print("✅ Circuit breaker went closed -> open -> half-open -> closed")
+        return True
+    print(f"❌ Expected {expected}, got {steps}")
+    return False
+
+
+def test_history_torn_line():
+    """Test that a torn last journal line is skipped and repaired."""
+    path = os.path.join(tempfile.mkdtemp(), "history.jsonl")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('{"city":"London,GB","ts":1}\n{"city":"Tokyo,JP","ts":2}\n{"city":"Par')
+    history = HistoryService(path)
+    history.add_city("Paris,FR")
+    history.flush()
+    # A fresh load must see the new search, not lose it to the torn line
+    reloaded = HistoryService(path).get_history()
+    if reloaded == ["Paris,FR", "Tokyo,JP", "London,GB"]:
+        print(f"✅ Torn line skipped, later search kept: {reloaded}")
+        return True
+    print(f"❌ Unexpected history after reload: {reloaded}")
+    return False
+
+
+def test_parse_csv():
+    """Test watchlist CSV import with and without a header row."""
+    with_header = _parse_csv("country,city\nGB,London\nJP,Tokyo\n")
+    without_header = _parse_csv("Paris\nOsaka,extra\n\n")
+    if with_header == ["London,GB", "Tokyo,JP"] and without_header == ["Paris", "Osaka"]:
+        print(f"✅ CSV parsed: {with_header} / {without_header}")
+        return True
+    print(f"❌ Unexpected CSV results: {with_header} / {without_header}")
+    return False
+
+
 async def run_tests():
     """Run all tests."""
     print("Running Weather Service Tests\n")
@@ -51,6 +254,14 @@ async def run_tests():
     results.append(await test_valid_city())
     results.append(await test_invalid_city())
     results.append(await test_empty_city())
+    results.append(await test_cache_hit())
+    results.append(await test_weather_many())
+    results.append(test_daily_local_timezone())
+    results.append(await test_single_flight())
+    results.append(await test_rate_limiter_lanes())
+    results.append(test_circuit_breaker_cycle())
+    results.append(test_history_torn_line())
+    results.append(test_parse_csv())
     
     print("\n" + "=" * 50)
     passed = sum(results)
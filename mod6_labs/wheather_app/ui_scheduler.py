@@ -0,0 +1,99 @@
+# ui_scheduler.py
+import asyncio
+import threading
+import time
+from typing import Dict, Optional
+
+import flet as ft
+
+FRAME_BUDGET = 1 / 60  # seconds; at most one page.update() per frame
+
+
+class UpdateScheduler:
+    """Coalesces page.update() calls.
+
+    Handlers call mark_dirty() after changing controls instead of calling
+    page.update() themselves. The first mark in a tick schedules a flush on
+    the page's event loop; every later mark before the flush is folded into
+    it, so one handler (or many concurrent ones) costs a single diff-and-send.
+    Safe to call from sync handlers, which Flet runs in worker threads.
+    """
+
+    def __init__(
+        self,
+        page: ft.Page,
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+        frame_budget: float = FRAME_BUDGET,
+    ):
+        self.page = page
+        self.loop = loop or page.loop
+        self.frame_budget = frame_budget
+        self._lock = threading.Lock()
+        self._scheduled = False
+        self._last_flush = 0.0
+        self.requested = 0  # mark_dirty() calls
+        self.flushed = 0  # page.update() calls actually made
+
+    def mark_dirty(self):
+        """Ask for a page.update() on the next tick."""
+        with self._lock:
+            self.requested += 1
+            if self._scheduled:
+                return
+            self._scheduled = True
+        self.loop.call_soon_threadsafe(self._flush)
+
+    def _flush(self):
+        # Keep to the frame budget: if the last flush was too recent, wait
+        # out the rest of the frame (more marks keep folding in meanwhile)
+        wait = self._last_flush + self.frame_budget - time.monotonic()
+        if wait > 0:
+            self.loop.call_later(wait, self._flush)
+            return
+        with self._lock:
+            self._scheduled = False
+        self._last_flush = time.monotonic()
+        self.flushed += 1
+        try:
+            self.page.update()
+        except Exception as e:
+            print(f"Page update failed: {e}")
+
+    @property
+    def avoided(self) -> int:
+        """page.update() calls saved by coalescing."""
+        return max(0, self.requested - self.flushed - self._scheduled)
+
+    def stats(self) -> Dict[str, int]:
+        return {"requested": self.requested, "flushed": self.flushed, "avoided": self.avoided}
+
+
+class Debouncer:
+    """Calls ``callback`` once calls have stopped for ``delay`` seconds.
+
+    Each call restarts the timer with the latest arguments, so typing a
+    word runs the callback once, for the final text. Safe to call from
+    sync handlers in worker threads.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, delay: float, callback):
+        self.loop = loop
+        self.delay = delay
+        self.callback = callback
+        self._handle: Optional[asyncio.TimerHandle] = None
+
+    def __call__(self, *args):
+        self.loop.call_soon_threadsafe(self._restart, args)
+
+    def _restart(self, args):
+        self._cancel()
+        self._handle = self.loop.call_later(self.delay, self.callback, *args)
+
+    def cancel(self):
+        """Drop a pending call. Safe to call from any thread."""
+        self.loop.call_soon_threadsafe(self._cancel)
+
+    def _cancel(self):
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
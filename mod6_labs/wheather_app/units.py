@@ -0,0 +1,51 @@
+# units.py
+"""Unit conversion for display. The API is always queried in metric and
+values are converted locally, so switching °C/°F needs no network call."""
+
+CANONICAL_UNITS = "metric"  # °C and m/s, as fetched and cached
+
+TEMP_SYMBOLS = {"metric": "°C", "imperial": "°F", "standard": "K"}
+SPEED_SYMBOLS = {"metric": "m/s", "imperial": "mph", "standard": "m/s"}
+MPS_TO_MPH = 2.2369362921
+
+
+def convert_temp(celsius, units: str):
+    """Convert a °C value to the given unit system. Non-numbers pass through."""
+    if not isinstance(celsius, (int, float)):
+        return celsius
+    if units == "imperial":
+        return celsius * 9 / 5 + 32
+    if units == "standard":
+        return celsius + 273.15
+    return celsius
+
+
+def convert_speed(mps, units: str):
+    """Convert a m/s value to the given unit system. Non-numbers pass through."""
+    if not isinstance(mps, (int, float)):
+        return mps
+    if units == "imperial":
+        return mps * MPS_TO_MPH
+    return mps
+
+
+def temp_symbol(units: str) -> str:
+    return TEMP_SYMBOLS.get(units, "°C")
+
+
+def speed_symbol(units: str) -> str:
+    return SPEED_SYMBOLS.get(units, "m/s")
+
+
+def format_temp(celsius, units: str, symbol: bool = True) -> str:
+    """e.g. format_temp(21.34, "imperial") -> "70.4°F"."""
+    value = convert_temp(celsius, units)
+    text = f"{round(value, 1)}" if isinstance(value, (int, float)) else "N/A"
+    if not symbol:
+        return text + ("" if units == "standard" else "°")
+    return text + (" " if units == "standard" else "") + temp_symbol(units)
+
+
+def format_speed(mps, units: str) -> str:
+    value = convert_speed(mps, units)
+    return f"{round(value, 1)}" if isinstance(value, (int, float)) else "N/A"
@@ -1,38 +1,227 @@
 # watchlist_service.py
+import atexit
+import csv
+import io
 import json
 import os
+import threading
+from typing import Iterable, List, Optional
+from city_resolver import canonical_name
+from storage import atomic_write
 
 WATCHLIST_FILE = "watchlist.json"
+SAVE_DELAY = 0.5  # seconds; changes made within this window share one write
+
 
 class WatchlistService:
-    def __init__(self):
-        self.file = WATCHLIST_FILE
-        self.cities = self._load()
+    """The user's saved cities, persisted write-behind.
+
+    Changes update memory at once and mark the list dirty; a timer writes
+    the file once the edits pause for ``save_delay`` seconds, so a burst of
+    adds/removes costs a single atomic write off the calling thread. Call
+    flush() on shutdown to write any pending change; it also runs at
+    interpreter exit, since the timer thread is a daemon.
+
+    The file is read by load() (or the first call that needs it), not the
+    constructor, so building the service costs no disk I/O.
+    """
+
+    def __init__(self, file_path: str = WATCHLIST_FILE, save_delay: float = SAVE_DELAY):
+        self.file = file_path
+        self.save_delay = save_delay
+        self._lock = threading.RLock()
+        self._timer: Optional[threading.Timer] = None
+        self._dirty = False
+        self._loaded = False
+        self.cities: List[str] = []
+        self._members = set()  # O(1) city_exists
+        # page.on_close doesn't reliably fire when the desktop window closes
+        atexit.register(self.flush)
+
+    def load(self):
+        """Read the saved watchlist the first time it is needed. Blocking;
+        safe to call from any thread."""
+        if self._loaded:
+            return
+        with self._lock:
+            if not self._loaded:
+                self.cities = self._read()
+                self._members = set(self.cities)
+                self._loaded = True
 
-    def _load(self):
+    def _read(self) -> List[str]:
         if os.path.exists(self.file):
             try:
-                with open(self.file, "r") as f:
-                    return json.load(f)
+                with open(self.file, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if isinstance(data, list):
+                    # tidy and drop duplicates (older versions could save them)
+                    return list(dict.fromkeys(canonical_name(c) for c in data if isinstance(c, str) and c))
             except Exception:
                 return []
         return []
 
+    # ---------- PERSISTENCE ----------
+    def _mark_dirty(self):
+        """Schedule a save, restarting the debounce window."""
+        with self._lock:
+            self._dirty = True
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.save_delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        """Write pending changes now (atomically). Safe from any thread."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._dirty:
+                return
+            text = json.dumps(self.cities)
+            self._dirty = False
+            try:
+                atomic_write(self.file, text)
+            except IOError as e:
+                self._dirty = True  # try again on the next change or flush
+                print(f"Failed to save watchlist: {e}")
+
     def save(self):
-        with open(self.file, "w") as f:
-            json.dump(self.cities, f)
+        """Write the watchlist now."""
+        self.load()
+        with self._lock:
+            self._dirty = True
+            self.flush()
 
+    # ---------- PUBLIC API ----------
     def add_city(self, city: str):
-        city = city.strip().title()
-        if city and city not in self.cities:
-            self.cities.append(city)
-            self.save()
+        city = canonical_name(city)
+        self.load()
+        with self._lock:
+            if city and city not in self._members:
+                self.cities.append(city)
+                self._members.add(city)
+                self._mark_dirty()
 
     def remove_city(self, city: str):
-        city = city.strip().title()
-        if city in self.cities:
-            self.cities.remove(city)
-            self.save()
+        city = canonical_name(city)
+        self.load()
+        with self._lock:
+            if city in self._members:
+                self.cities.remove(city)
+                self._members.discard(city)
+                self._mark_dirty()
+
+    def city_exists(self, city: str) -> bool:
+        self.load()
+        return canonical_name(city) in self._members
+
+    def clear_watchlist(self):
+        self.load()
+        with self._lock:
+            if self.cities:
+                self.cities = []
+                self._members.clear()
+                self._mark_dirty()
 
     def get_watchlist(self):
-        return self.cities
\ No newline at end of file
+        self.load()
+        return list(self.cities)
+
+    # ---------- IMPORT / EXPORT ----------
+    def add_cities(self, cities: Iterable[str]) -> List[str]:
+        """Add many cities as one change (one write). Names are tidied and
+        duplicates skipped. Returns the cities actually added."""
+        added = []
+        self.load()
+        with self._lock:
+            for city in cities:
+                city = canonical_name(city)
+                if city and city not in self._members:
+                    self.cities.append(city)
+                    self._members.add(city)
+                    added.append(city)
+            if added:
+                self._mark_dirty()
+        return added
+
+    def import_file(self, path: str) -> List[str]:
+        """Add the cities listed in a .csv or .json file. Blocking; run off
+        the UI loop. Raises ValueError if the file can't be read. Returns
+        the cities added."""
+        try:
+            with open(path, "r", encoding="utf-8-sig") as f:
+                text = f.read()
+        except (IOError, UnicodeDecodeError) as e:
+            raise ValueError(f"Could not read {os.path.basename(path)}: {e}")
+        if path.lower().endswith(".json"):
+            cities = _parse_json(text)
+        else:
+            cities = _parse_csv(text)
+        # Parse everything first so a bad file changes nothing
+        return self.add_cities(cities)
+
+    def export_file(self, path: str) -> int:
+        """Write the watchlist to a .csv or .json file. Blocking; run off
+        the UI loop. Returns the number of cities written."""
+        cities = self.get_watchlist()
+        if path.lower().endswith(".json"):
+            text = json.dumps(cities, indent=2)
+        else:
+            out = io.StringIO()
+            writer = csv.writer(out, lineterminator="\n")
+            writer.writerow(["city", "country"])
+            for city in cities:
+                name, _, country = city.partition(",")
+                writer.writerow([name, country])
+            text = out.getvalue()
+        atomic_write(path, text)
+        return len(cities)
+
+
+def _join(name, country="") -> str:
+    name = str(name or "").strip()
+    country = str(country or "").strip()
+    return f"{name},{country}" if name and country else name
+
+
+def _parse_json(text: str) -> List[str]:
+    """Cities from a JSON list of names or of {"city"/"name", "country"}
+    objects, optionally wrapped as {"cities": [...]}."""
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Invalid JSON: {e}")
+    if isinstance(data, dict):
+        data = data.get("cities", [])
+    if not isinstance(data, list):
+        raise ValueError("JSON file must contain a list of cities.")
+    cities = []
+    for item in data:
+        if isinstance(item, str):
+            cities.append(item)
+        elif isinstance(item, dict):
+            cities.append(_join(item.get("city") or item.get("name"), item.get("country")))
+    return [c for c in cities if c]
+
+
+def _parse_csv(text: str) -> List[str]:
+    """Cities from CSV: the first column, plus a "country" column when the
+    header has one. A header row is optional."""
+    rows = [row for row in csv.reader(io.StringIO(text)) if row and any(cell.strip() for cell in row)]
+    if not rows:
+        return []
+    header = [cell.strip().lower() for cell in rows[0]]
+    city_col, country_col = 0, None
+    if "city" in header or "name" in header:
+        city_col = header.index("city") if "city" in header else header.index("name")
+        country_col = header.index("country") if "country" in header else None
+        rows = rows[1:]
+    cities = []
+    for row in rows:
+        name = row[city_col] if city_col < len(row) else ""
+        country = row[country_col] if country_col is not None and country_col < len(row) else ""
+        cities.append(_join(name, country))
+    return [c for c in cities if c]
@@ -0,0 +1,217 @@
+# weather_card.py
+"""The current-weather card and its stats panel.
+
+Both are built once with named controls. show() patches the values,
+colors and icon of the existing controls in place, so a refresh
+sends Flet only the properties that changed instead of a new subtree.
+"""
+from datetime import datetime
+from typing import List, Optional
+
+import flet as ft
+
+from icon_service import IconStore
+from models import CurrentConditions
+from units import format_speed, format_temp, speed_symbol
+
+PLACEHOLDER = "Search for a city to see weather information"
+
+
+def weather_emoji(condition: str) -> str:
+    """Get emoji based on weather condition"""
+    condition_lower = condition.lower()
+    if "clear" in condition_lower:
+        return "☀️"
+    elif "cloud" in condition_lower:
+        return "☁️"
+    elif "rain" in condition_lower:
+        return "🌧️"
+    elif "snow" in condition_lower:
+        return "❄️"
+    elif "thunder" in condition_lower or "storm" in condition_lower:
+        return "⛈️"
+    elif "mist" in condition_lower or "fog" in condition_lower:
+        return "🌫️"
+    return "🌤️"
+
+
+def gradient_colors(condition: str) -> List[str]:
+    """Background gradient for the card, picked from the condition."""
+    condition_lower = condition.lower()
+    if "clear" in condition_lower:
+        return [ft.Colors.LIGHT_BLUE_200, ft.Colors.BLUE_100]
+    if "cloud" in condition_lower:
+        return [ft.Colors.GREY_400, ft.Colors.BLUE_GREY_200]
+    if "rain" in condition_lower:
+        return [ft.Colors.BLUE_GREY_600, ft.Colors.BLUE_GREY_300]
+    return [ft.Colors.INDIGO_200, ft.Colors.BLUE_300]
+
+
+def _clock(timestamp: Optional[int]) -> str:
+    return datetime.fromtimestamp(timestamp).strftime("%H:%M") if timestamp else "N/A"
+
+
+def _na(value):
+    return "N/A" if value is None else value
+
+
+def _metric(icon: str, value: ft.Text, label: ft.Text) -> ft.Column:
+    return ft.Column(
+        [ft.Icon(icon, size=20), value, label],
+        horizontal_alignment=ft.CrossAxisAlignment.CENTER,
+    )
+
+
+def _stat(icon: str, color: str, label: str, value: ft.Text) -> ft.Column:
+    return ft.Column(
+        [
+            ft.Icon(icon, size=30, color=color),
+            ft.Text(label, size=14, weight=ft.FontWeight.BOLD),
+            value,
+        ],
+        horizontal_alignment=ft.CrossAxisAlignment.CENTER,
+    )
+
+
+class WeatherCard:
+    """Weather card (``view``) and stats panel (``stats``) for one city."""
+
+    def __init__(self, width: int = 850, light: bool = True, icons: Optional[IconStore] = None):
+        self.icons = icons or IconStore()
+        # Message shown before the first result and while fetching
+        self.message = ft.Text(PLACEHOLDER, size=16, color=ft.Colors.GREY_600)
+
+        # ---------- CARD ----------
+        self.title = ft.Text(size=24, weight=ft.FontWeight.BOLD)
+        self.coords = ft.Text(size=12, color=ft.Colors.GREY_700)
+        self.icon = ft.Image(width=100, height=100)
+        self.condition = ft.Text(size=18, italic=True)
+        self.temp = ft.Text(size=48, weight=ft.FontWeight.BOLD, color=ft.Colors.BLUE_900)
+        self.feels_like = ft.Text(size=16, color=ft.Colors.GREY_800)
+        self.min_max = ft.Text(size=14, color=ft.Colors.GREY_700)
+        self.humidity = ft.Text(size=14, weight=ft.FontWeight.BOLD)
+        self.wind = ft.Text(size=14, weight=ft.FontWeight.BOLD)
+        self.wind_unit = ft.Text(size=12)
+        self.pressure = ft.Text(size=14, weight=ft.FontWeight.BOLD)
+        self.clouds = ft.Text(size=14, weight=ft.FontWeight.BOLD)
+        self.details = ft.Column(
+            [
+                self.title,
+                self.coords,
+                self.icon,
+                self.condition,
+                self.temp,
+                self.feels_like,
+                self.min_max,
+                ft.Divider(height=20),
+                ft.Row(
+                    [
+                        _metric(ft.Icons.WATER_DROP, self.humidity, ft.Text("Humidity", size=12)),
+                        _metric(ft.Icons.AIR, self.wind, self.wind_unit),
+                        _metric(ft.Icons.COMPRESS, self.pressure, ft.Text("hPa", size=12)),
+                        _metric(ft.Icons.CLOUD, self.clouds, ft.Text("Clouds", size=12)),
+                    ],
+                    alignment=ft.MainAxisAlignment.SPACE_AROUND,
+                ),
+            ],
+            horizontal_alignment=ft.CrossAxisAlignment.CENTER,
+            visible=False,
+        )
+        self.gradient = ft.LinearGradient(
+            begin=ft.alignment.top_center,
+            end=ft.alignment.bottom_center,
+            colors=[],
+        )
+        self.view = ft.Container(
+            width=width,
+            border_radius=16,
+            padding=20,
+            animate=300,
+            content=ft.Column(
+                [self.message, self.details],
+                alignment=ft.MainAxisAlignment.CENTER,
+                horizontal_alignment=ft.CrossAxisAlignment.CENTER,
+            ),
+        )
+
+        # ---------- STATS ----------
+        self.visibility = ft.Text(size=16)
+        self.wind_deg = ft.Text(size=16)
+        self.sunrise = ft.Text(size=16)
+        self.sunset = ft.Text(size=16)
+        self.stats = ft.Container(
+            content=ft.Row(
+                [
+                    _stat(ft.Icons.VISIBILITY, ft.Colors.BLUE_700, "Visibility", self.visibility),
+                    ft.VerticalDivider(),
+                    _stat(ft.Icons.EXPLORE, ft.Colors.ORANGE_700, "Wind Direction", self.wind_deg),
+                    ft.VerticalDivider(),
+                    _stat(ft.Icons.WB_SUNNY, ft.Colors.AMBER_700, "Sunrise", self.sunrise),
+                    ft.VerticalDivider(),
+                    _stat(ft.Icons.NIGHTS_STAY, ft.Colors.INDIGO_700, "Sunset", self.sunset),
+                ],
+                alignment=ft.MainAxisAlignment.SPACE_AROUND,
+            ),
+            bgcolor=ft.Colors.BLUE_50 if light else ft.Colors.GREY_900,
+            border_radius=12,
+            padding=15,
+            width=width,
+            visible=False,
+        )
+
+    def show_message(self, text: str, color: Optional[str] = None):
+        """Show a one-line message (e.g. "Fetching...") instead of the details."""
+        self.message.value = text
+        self.message.color = color or ft.Colors.GREY_600
+        self.message.visible = True
+        self.details.visible = False
+        self.stats.visible = False
+
+    def show(self, data: CurrentConditions, units: str, city: str = ""):
+        """Patch the card and stats with new (metric) conditions, shown in ``units``."""
+        name = data.name or city
+        condition = data.condition
+
+        self.title.value = f"{weather_emoji(condition)} {name}, {data.country}"
+        self.coords.value = f"📍 {_na(data.lat)}, {_na(data.lon)}"
+        self.icons.apply(self.icon, data.icon)
+        self.condition.value = condition
+        self.temp.value = format_temp(data.temp, units)
+        self.feels_like.value = f"Feels like {format_temp(data.feels_like, units)}"
+        self.min_max.value = (
+            f"Min: {format_temp(data.temp_min, units, symbol=False)} | "
+            f"Max: {format_temp(data.temp_max, units, symbol=False)}"
+        )
+        self.humidity.value = f"{_na(data.humidity)}%"
+        self.wind.value = format_speed(data.wind_speed, units)
+        self.wind_unit.value = speed_symbol(units)
+        self.pressure.value = f"{_na(data.pressure)}"
+        self.clouds.value = f"{_na(data.clouds)}%"
+
+        visibility = data.visibility
+        self.visibility.value = f"{visibility/1000 if isinstance(visibility, (int, float)) else 'N/A'} km"
+        self.wind_deg.value = f"{_na(data.wind_deg)}°"
+        self.sunrise.value = _clock(data.sunrise)
+        self.sunset.value = _clock(data.sunset)
+
+        # Only swap the gradient when the palette actually changes
+        colors = gradient_colors(condition)
+        if self.view.gradient is None or self.gradient.colors != colors:
+            self.gradient = ft.LinearGradient(
+                begin=ft.alignment.top_center,
+                end=ft.alignment.bottom_center,
+                colors=colors,
+            )
+            self.view.gradient = self.gradient
+        self.view.bgcolor = None
+
+        self.message.visible = False
+        self.details.visible = True
+        self.stats.visible = True
+
+    def apply_theme(self, light: bool):
+        """Apply theme-aware background colors."""
+        bg_color = ft.Colors.BLUE_50 if light else ft.Colors.GREY_900
+        if self.view.gradient is None:
+            self.view.bgcolor = bg_color
+        self.stats.bgcolor = bg_color
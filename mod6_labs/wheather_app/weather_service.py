@@ -1,7 +1,15 @@
 # weather_service.py
+import asyncio
+import time
 import httpx
-from typing import Dict
+from typing import AsyncIterator, Dict, Iterable, List, NamedTuple, Optional, Tuple
 from config import Config
+from cache_service import FRESH, STALE, DiskCache, ResponseCache
+from rate_limiter import BACKGROUND, INTERACTIVE, RateLimiter, Ticket
+from resilience import CircuitBreaker, RetryPolicy
+from city_resolver import CityRef, CityResolver, canonical_name
+from units import CANONICAL_UNITS
+from models import CurrentConditions, Forecast, ParseError, parse_payload
 
 
 class WeatherServiceError(Exception):
@@ -9,60 +17,626 @@ class WeatherServiceError(Exception):
     pass
 
 
+class TransientWeatherError(WeatherServiceError):
+    """A failure worth retrying (timeouts, network errors, 429 and 5xx)."""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class CircuitOpenError(WeatherServiceError):
+    """Raised without calling the API while the circuit breaker is open."""
+    pass
+
+
+class BatchResult(NamedTuple):
+    """Outcome for one city in a get_weather_many batch."""
+    city: str
+    data: Optional[CurrentConditions]
+    error: Optional[Exception]
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class CityBundle(NamedTuple):
+    """Current weather and forecast requests for one city, started together."""
+    current: asyncio.Task
+    forecast: asyncio.Task
+
+    def cancel(self):
+        self.current.cancel()
+        self.forecast.cancel()
+
+
+def _consume_exception(task: asyncio.Task):
+    # Mark a failure as retrieved so an unawaited half of a bundle does not
+    # log "Task exception was never retrieved"
+    if not task.cancelled():
+        task.exception()
+
+
 class WeatherService:
     """Handles API communication with OpenWeatherMap."""
 
-    def __init__(self):
+    def __init__(
+        self,
+        max_connections: Optional[int] = None,
+        max_keepalive_connections: Optional[int] = None,
+        keepalive_expiry: Optional[float] = None,
+        http2: Optional[bool] = None,
+        cache: Optional[ResponseCache] = None,
+        disk_cache: Optional[DiskCache] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        resolver: Optional[CityResolver] = None,
+    ):
         self.api_key = Config.API_KEY
         self.base_url = Config.BASE_URL
+        self.forecast_url = Config.FORECAST_URL
         self.timeout = Config.TIMEOUT
 
-    async def get_weather(self, city: str) -> Dict:
-        """Fetch current weather for a given city."""
+        # Connection pool settings for the shared client
+        self.limits = httpx.Limits(
+            max_connections=max_connections or Config.MAX_CONNECTIONS,
+            max_keepalive_connections=max_keepalive_connections or Config.MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=keepalive_expiry if keepalive_expiry is not None else Config.KEEPALIVE_EXPIRY,
+        )
+        self.http2 = Config.HTTP2 if http2 is None else http2
+        self._client: Optional[httpx.AsyncClient] = None
+        self._start_lock = asyncio.Lock()  # one client, however many first callers
+
+        # Response cache keyed by (endpoint, city, units). Payloads are always
+        # fetched in CANONICAL_UNITS and converted for display, so toggling
+        # °C/°F never splits the cache or costs a request.
+        self.cache = cache or ResponseCache(Config.CACHE_MAX_ENTRIES, Config.CACHE_STALE_TTL)
+        self.cache_ttl = dict(Config.CACHE_TTL)
+        self._refreshing: Dict[Tuple[str, str, str], asyncio.Task] = {}
+
+        # Upstream calls currently in flight, for request coalescing
+        self._inflight: Dict[Tuple[str, str, str], asyncio.Task] = {}
+        self._tickets: Dict[Tuple[str, str, str], Ticket] = {}
+        self._waiters: Dict[asyncio.Task, int] = {}  # callers per in-flight call
+        self.coalesced = 0
+        self.retries = 0
+
+        # Optional on-disk copy of every payload (opened lazily)
+        if disk_cache is None and Config.DISK_CACHE_ENABLED:
+            disk_cache = DiskCache(
+                Config.DISK_CACHE_FILE, Config.DISK_CACHE_MAX_ROWS, Config.DISK_CACHE_MAX_AGE
+            )
+        self.disk_cache = disk_cache
+        self.disk_hits = 0
+        self._background = set()
+
+        # Client-side quota guard shared by every upstream call
+        self.rate_limiter = rate_limiter or RateLimiter(
+            Config.RATE_LIMIT_CALLS, Config.RATE_LIMIT_PERIOD, Config.RATE_LIMIT_BURST
+        )
+
+        # Retries for transient failures, and fail-fast during outages
+        self.retry_policy = retry_policy or RetryPolicy(
+            Config.MAX_RETRIES, Config.RETRY_BASE_DELAY, Config.RETRY_MAX_DELAY
+        )
+        self.circuit_breaker = circuit_breaker or CircuitBreaker(
+            Config.BREAKER_WINDOW,
+            Config.BREAKER_MIN_CALLS,
+            Config.BREAKER_FAILURE_RATE,
+            Config.BREAKER_RESET_TIMEOUT,
+        )
+
+        # Typed names -> OpenWeatherMap city ids, learned from responses
+        self.resolver = resolver or CityResolver(Config.CITY_INDEX_FILE)
+
+    # ---------- CLIENT LIFECYCLE ----------
+    async def start(self):
+        """Open the shared HTTP client. Safe to call more than once, and
+        concurrently: later callers wait for the first one's client."""
+        if self._client is not None and not self._client.is_closed:
+            return
+        async with self._start_lock:
+            # Another caller may have opened it while we waited
+            if self._client is not None and not self._client.is_closed:
+                return
+            await asyncio.to_thread(self._configure)
+            await asyncio.to_thread(self.resolver.load)
+            try:
+                self._client = httpx.AsyncClient(
+                    timeout=self.timeout, limits=self.limits, http2=self.http2
+                )
+            except ImportError:
+                # HTTP/2 was requested but the "h2" package is missing
+                print("HTTP/2 support not installed, falling back to HTTP/1.1")
+                self.http2 = False
+                self._client = httpx.AsyncClient(timeout=self.timeout, limits=self.limits)
+
+    def _configure(self):
+        """Read the API settings (.env is loaded on first start, not at
+        import). Blocking."""
+        Config.load()
+        try:
+            Config.validate()
+        except ValueError as e:
+            raise WeatherServiceError(str(e))
+        self.api_key = Config.API_KEY
+        self.base_url = Config.BASE_URL
+        self.forecast_url = Config.FORECAST_URL
+
+    async def aclose(self):
+        """Close the shared HTTP client and its pooled connections."""
+        for task in list(self._refreshing.values()) + list(self._inflight.values()):
+            task.cancel()
+        if self._background:
+            # let pending disk writes finish
+            await asyncio.gather(*self._background, return_exceptions=True)
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        if self.disk_cache is not None:
+            await asyncio.to_thread(self.disk_cache.close)
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+
+    async def _get_client(self) -> httpx.AsyncClient:
+        """Return the shared client, opening it lazily if needed."""
+        if self._client is None or self._client.is_closed:
+            await self.start()
+        return self._client
+
+    # ---------- API CALLS ----------
+    async def get_weather(
+        self,
+        city: str,
+        priority: int = INTERACTIVE,
+        timeout: Optional[float] = None,
+        force: bool = False,
+    ) -> CurrentConditions:
+        """Fetch current weather for a given city.
+
+        Use ``priority=BACKGROUND`` for refreshes and batch work so that
+        interactive searches are sent first when the rate limit is reached,
+        and ``PREFETCH`` for speculative warming that should wait for both.
+        ``timeout`` limits each upstream attempt; it starts once the rate
+        limiter lets the request go, so time spent queued never counts.
+        ``force=True`` skips the cache (for scheduled refreshes), though a
+        saved copy is still returned if the API is unreachable.
+        """
         if not city:
             raise WeatherServiceError("City name cannot be empty.")
 
-        # basic character validation (letters, spaces, dashes)
-        if not all(ch.isalpha() or ch.isspace() or ch in "-'" for ch in city):
+        # basic character validation (letters, spaces, dashes, and the
+        # comma in canonical keys like "London,GB")
+        if not all(ch.isalpha() or ch.isspace() or ch in "-'," for ch in city):
             raise WeatherServiceError("Invalid characters in city name.")
 
-        params = {"q": city.strip(), "appid": self.api_key, "units": Config.UNITS}
+        return await self._cached_fetch("weather", city, priority, timeout, force)
+
+    async def get_forecast(self, city: str, priority: int = INTERACTIVE, force: bool = False) -> Forecast:
+        """Get 5-day weather forecast."""
+        if not city:
+            raise WeatherServiceError("City name cannot be empty.")
+
+        return await self._cached_fetch("forecast", city, priority, force=force)
+
+    def get_city_bundle(self, city: str, priority: int = INTERACTIVE, force: bool = False) -> CityBundle:
+        """Start the current weather and forecast requests for a city at once.
+
+        Await ``bundle.current`` to render conditions as soon as they arrive,
+        then ``bundle.forecast``; the whole screen takes about as long as the
+        slower of the two calls rather than their sum. Must be called from
+        the event loop. ``force`` skips the cache for the current weather
+        only; the forecast changes slowly and is left to its cache TTL.
+        """
+        current = asyncio.create_task(self.get_weather(city, priority, force=force))
+        forecast = asyncio.create_task(self.get_forecast(city, priority))
+        for task in (current, forecast):
+            task.add_done_callback(_consume_exception)
+        return CityBundle(current, forecast)
+
+    async def get_weather_many(
+        self,
+        cities: Iterable[str],
+        concurrency: Optional[int] = None,
+        deadline: Optional[float] = None,
+        priority: int = BACKGROUND,
+        timeout: Optional[float] = None,
+        force: bool = False,
+    ) -> AsyncIterator[BatchResult]:
+        """Fetch current weather for many cities with bounded concurrency.
+
+        Yields a BatchResult per city as each one completes. At most
+        ``concurrency`` requests run at once. A city whose request takes
+        longer than ``timeout`` seconds once sent (time waiting for the rate
+        limiter doesn't count), or is still unfinished when ``deadline``
+        seconds have passed, is yielded with a timeout error. Pass 0 for
+        either to turn that limit off. ``force`` skips the cache, as in
+        get_weather.
+        """
+        concurrency = concurrency or Config.BATCH_CONCURRENCY
+        deadline = Config.BATCH_DEADLINE if deadline is None else deadline
+        timeout = Config.BATCH_CITY_TIMEOUT if timeout is None else timeout
+
+        # Drop blanks and repeats. Spellings of the same city (e.g. "London"
+        # and "London,GB") share one fetch, but each gets its own result
+        batch = list(dict.fromkeys(c for c in cities if c and c.strip()))
+        groups: Dict[str, List[str]] = {}
+        for city in batch:
+            groups.setdefault(self.normalize_city(city), []).append(city)
+
+        semaphore = asyncio.Semaphore(concurrency)
+        results: asyncio.Queue = asyncio.Queue()
+
+        async def worker(spellings: List[str]):
+            async with semaphore:
+                try:
+                    # A slow city gives up its slot instead of holding up the rest
+                    data = await self.get_weather(spellings[0], priority, timeout, force)
+                    error = None
+                except Exception as e:
+                    data, error = None, e
+            for city in spellings:
+                results.put_nowait(BatchResult(city, data, error))
+
+        tasks = [asyncio.create_task(worker(spellings)) for spellings in groups.values()]
+        remaining = set(batch)
+        loop = asyncio.get_running_loop()
+        end = loop.time() + deadline if deadline else None
+        try:
+            while remaining:
+                wait = None if end is None else max(0.0, end - loop.time())
+                try:
+                    result = await asyncio.wait_for(results.get(), wait)
+                except asyncio.TimeoutError:
+                    break
+                remaining.discard(result.city)
+                yield result
+
+            for city in batch:
+                if city in remaining:
+                    yield BatchResult(city, None, WeatherServiceError(f"Timed out fetching weather for {city}."))
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    # ---------- CITY RESOLUTION ----------
+    async def resolve_city(self, city: str) -> CityRef:
+        """Return the canonical city for a name, calling the API only the
+        first time a name is seen."""
+        ref = self.resolver.lookup(city)
+        if ref is None:
+            await self.get_weather(city)
+            ref = self.resolver.lookup(city)
+        if ref is None:
+            raise WeatherServiceError(f"Could not resolve city '{city}'.")
+        return ref
+
+    def canonical_key(self, city: str) -> str:
+        """Key to store in history/watchlist, e.g. "London,GB" once resolved."""
+        ref = self.resolver.lookup(city)
+        return ref.key if ref is not None else canonical_name(city)
+
+    def _learn(self, city: str, data: Dict):
+        """Remember which city a query resolved to and save the map."""
+        self.resolver.learn(city, data)
+        if self.resolver.dirty:
+            self._spawn(asyncio.to_thread(self.resolver.save, self.resolver.snapshot()))
+
+    # ---------- CACHE ----------
+    def normalize_city(self, city: str) -> str:
+        """Normalize a city name for use as a cache key. Resolved cities use
+        their canonical key, so "london" and "London,GB" share entries."""
+        ref = self.resolver.lookup(city)
+        return (ref.key if ref is not None else " ".join(city.split())).lower()
+
+    def _cache_key(self, endpoint: str, city: str) -> Tuple[str, str, str]:
+        return (endpoint, self.normalize_city(city), CANONICAL_UNITS)
+
+    def cache_stats(self) -> Dict[str, float]:
+        """Hit/miss counters for the response cache."""
+        stats = self.cache.stats()
+        stats["disk_hits"] = self.disk_hits
+        stats["coalesced"] = self.coalesced
+        return stats
+
+    def rate_limit_stats(self) -> Dict[str, Dict[str, float]]:
+        """Queue depth and wait-time metrics from the rate limiter."""
+        return self.rate_limiter.stats()
+
+    def health_stats(self) -> Dict[str, float]:
+        """Circuit breaker state and retry count."""
+        stats = self.circuit_breaker.stats()
+        stats["retries"] = self.retries
+        return stats
+
+    async def _cached_fetch(
+        self,
+        endpoint: str,
+        city: str,
+        priority: int = INTERACTIVE,
+        timeout: Optional[float] = None,
+        force: bool = False,
+    ):
+        """Serve a parsed model from cache when possible, otherwise call the API.
+
+        Stale entries are returned immediately and refreshed in the background.
+        With ``force`` the cache is skipped and the API is always asked.
+        """
+        key = self._cache_key(endpoint, city)
+        data, state = (None, None) if force else self.cache.lookup(key)
+        if state is None and not force and await self._load_from_disk(key):
+            self.cache.misses -= 1  # counted again below if still unusable
+            self.disk_hits += 1
+            data, state = self.cache.lookup(key)
+        if state == FRESH:
+            return data
+        if state == STALE:
+            # The caller already has data, so never refresh ahead of
+            # background work, but keep prefetch refreshes in their lane
+            self._revalidate(endpoint, city, key, max(priority, BACKGROUND))
+            return data
+
+        try:
+            return await self._fetch_shared(endpoint, city, key, priority, timeout)
+        except (TransientWeatherError, CircuitOpenError):
+            # Upstream is struggling: fall back to any saved copy
+            saved = await self._peek(endpoint, city)
+            if saved is not None:
+                return saved
+            raise
+
+    async def _fetch_shared(
+        self,
+        endpoint: str,
+        city: str,
+        key: Tuple[str, str, str],
+        priority: int = INTERACTIVE,
+        timeout: Optional[float] = None,
+    ):
+        """Make at most one upstream call per key at a time.
+
+        Concurrent callers for the same (endpoint, city, units) wait on the
+        same task and share its result or exception. The call is cancelled,
+        freeing its connection and rate-limit slot, only when every caller
+        waiting on it has been cancelled.
+        """
+        task = self._inflight.get(key)
+        # Never join a call that is being cancelled; its CancelledError
+        # would reach a caller nobody cancelled
+        if task is None or task.cancelling():
+            ticket = Ticket(priority)
+            task = asyncio.create_task(self._fetch_and_store(endpoint, city, key, ticket, timeout))
+            self._inflight[key] = task
+            self._tickets[key] = ticket
+            task.add_done_callback(lambda t: self._forget_inflight(key, t))
+        else:
+            self.coalesced += 1
+            # an interactive caller joining a background call speeds it up
+            self.rate_limiter.promote(self._tickets[key], priority)
+        # shield so one caller giving up does not cancel the call for the others
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if self._waiters[task] == 1 and not task.done():
+                task.cancel()  # nobody is left to use the result
+                self._forget_inflight(key, task)
+            raise
+        finally:
+            self._waiters[task] -= 1
+            if not self._waiters[task]:
+                del self._waiters[task]
+
+    def _forget_inflight(self, key: Tuple[str, str, str], task: asyncio.Task):
+        # A newer call may already have replaced this one under the key
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+            self._tickets.pop(key, None)
+
+    async def _fetch_and_store(
+        self,
+        endpoint: str,
+        city: str,
+        key: Tuple[str, str, str],
+        ticket: Ticket,
+        timeout: Optional[float] = None,
+    ):
+        data = await self._request_with_retry(endpoint, city, key[2], ticket, timeout)
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(self.base_url, params=params)
+            model = parse_payload(endpoint, data, city)
+        except ParseError as e:
+            raise WeatherServiceError(f"Unexpected response from weather service: {e}")
+        # The request may have just resolved the name; file the payload
+        # under the canonical key, the only one later lookups will use
+        self._store(self._cache_key(endpoint, city), model, data)
+        return model
 
-                # Handle known status codes
-                if response.status_code == 401:
-                    raise WeatherServiceError("401: Invalid API key.")
-                elif response.status_code == 404:
-                    raise WeatherServiceError(f"404: City '{city}' not found.")
-                elif response.status_code >= 500:
-                    raise WeatherServiceError("Server error. Try again later.")
+    async def _request_with_retry(
+        self, endpoint: str, city: str, units: str, ticket: Ticket, timeout: Optional[float] = None
+    ) -> Dict:
+        """Call the API through the circuit breaker and rate limiter,
+        retrying transient failures with backoff and jitter. ``timeout``
+        bounds each attempt, not the wait for a token or the backoff."""
+        attempt = 0
+        while True:
+            if not self.circuit_breaker.allow():
+                raise CircuitOpenError("Weather service is unavailable. Try again shortly.")
+            await self.rate_limiter.acquire(ticket=ticket)
+            try:
+                data = await asyncio.wait_for(self._request(endpoint, city, units=units), timeout or None)
+            except asyncio.TimeoutError:
+                # Over the caller's limit: give up now rather than retry
+                self.circuit_breaker.record_failure()
+                raise TransientWeatherError(f"Timed out fetching {endpoint} for {city}.")
+            except TransientWeatherError as e:
+                self.circuit_breaker.record_failure()
+                if attempt >= self.retry_policy.max_retries:
+                    raise
+                await asyncio.sleep(self.retry_policy.delay(attempt, e.retry_after))
+                attempt += 1
+                self.retries += 1
+                continue
+            except WeatherServiceError:
+                # The API answered (e.g. 404), so it is healthy
+                self.circuit_breaker.record_success()
+                raise
+            self.circuit_breaker.record_success()
+            return data
 
-                response.raise_for_status()
-                return response.json()
+    def _store(self, key: Tuple[str, str, str], model, data: Dict):
+        """Keep the parsed model in memory and (in the background) the raw
+        payload on disk."""
+        fetched_at = time.time()
+        self.cache.set(key, model, self.cache_ttl[key[0]], fetched_at)
+        if self.disk_cache is not None:
+            self._spawn(asyncio.to_thread(self.disk_cache.put, key, data, fetched_at))
 
+    def _spawn(self, coro):
+        task = asyncio.create_task(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+        return task
+
+    def _revalidate(
+        self, endpoint: str, city: str, key: Tuple[str, str, str], priority: int = BACKGROUND
+    ):
+        """Start a refresh for a stale entry (once per key) at ``priority``."""
+        if key in self._refreshing:
+            # Already queued: a more urgent caller moves it up
+            ticket = self._tickets.get(key)
+            if ticket is not None:
+                self.rate_limiter.promote(ticket, priority)
+            return
+        task = asyncio.create_task(self._refresh(endpoint, city, key, priority))
+        self._refreshing[key] = task
+        task.add_done_callback(lambda t: self._refreshing.pop(key, None))
+
+    async def _refresh(
+        self, endpoint: str, city: str, key: Tuple[str, str, str], priority: int = BACKGROUND
+    ):
+        try:
+            await self._fetch_shared(endpoint, city, key, priority)
+        except WeatherServiceError:
+            pass  # keep serving the stale copy
+
+    # ---------- DISK CACHE ----------
+    async def _load_from_disk(self, key: Tuple[str, str, str]) -> bool:
+        """Copy one payload from disk into memory. Returns True if found."""
+        if self.disk_cache is None:
+            return False
+        row = await asyncio.to_thread(self.disk_cache.get, key)
+        if row is None:
+            return False
+        model = self._parse_saved(key, row[0])
+        if model is None:
+            return False
+        self.cache.set(key, model, self.cache_ttl[key[0]], row[1])
+        return True
+
+    @staticmethod
+    def _parse_saved(key: Tuple[str, str, str], data: Dict):
+        """Parse a payload read from disk; unreadable rows are ignored."""
+        try:
+            return parse_payload(key[0], data, key[1].title())
+        except ParseError:
+            return None
+
+    async def warm_from_disk(self, cities: Iterable[str]) -> int:
+        """Preload saved payloads for the given cities (e.g. history and
+        watchlist) into memory. Returns the number of entries loaded."""
+        if self.disk_cache is None:
+            return 0
+        keys = [self._cache_key(endpoint, city) for city in cities for endpoint in self.cache_ttl]
+        rows = await asyncio.to_thread(self.disk_cache.get_many, keys)
+        loaded = 0
+        for key, data, fetched_at in rows:
+            model = self._parse_saved(key, data)
+            if model is not None:
+                self.cache.set(key, model, self.cache_ttl[key[0]], fetched_at)
+                loaded += 1
+        return loaded
+
+    async def peek_weather(self, city: str) -> Optional[CurrentConditions]:
+        """Return the last saved current weather for a city without any
+        network call, however old it is, or None if nothing is saved."""
+        return await self._peek("weather", city)
+
+    async def peek_forecast(self, city: str) -> Optional[Forecast]:
+        """Return the last saved forecast for a city without any network call."""
+        return await self._peek("forecast", city)
+
+    async def _peek(self, endpoint: str, city: str):
+        if not city:
+            return None
+        key = self._cache_key(endpoint, city)
+        entry = self.cache.peek(key)
+        if entry is not None:
+            return entry
+        if self.disk_cache is not None:
+            row = await asyncio.to_thread(self.disk_cache.get, key)
+            if row is not None:
+                return self._parse_saved(key, row[0])
+        return None
+
+    # ---------- HTTP ----------
+    async def _request(self, endpoint: str, city: str, units: Optional[str] = None) -> Dict:
+        """Call an OpenWeatherMap endpoint and map failures to WeatherServiceError."""
+        # Opening the client first loads the settings and the city map
+        client = await self._get_client()
+        url = self.base_url if endpoint == "weather" else self.forecast_url
+        params = {"appid": self.api_key, "units": units or CANONICAL_UNITS}
+
+        # Query by id once the name is resolved: cheaper and unambiguous
+        ref = self.resolver.lookup(city)
+        if ref is not None:
+            params["id"] = ref.id
+        else:
+            params["q"] = city.strip()
+        try:
+            response = await client.get(url, params=params)
+
+            # Handle known status codes
+            if response.status_code == 401:
+                raise WeatherServiceError("401: Invalid API key.")
+            elif response.status_code == 404:
+                raise WeatherServiceError(f"404: City '{city}' not found.")
+            elif response.status_code == 429:
+                raise TransientWeatherError(
+                    "429: Too many requests. Try again later.",
+                    retry_after=self._retry_after(response),
+                )
+            elif response.status_code >= 500:
+                raise TransientWeatherError("Server error. Try again later.")
+
+            response.raise_for_status()
+            data = response.json()
+            self._learn(city, data)
+            return data
+
+        except WeatherServiceError:
+            raise
         except httpx.TimeoutException:
-            raise WeatherServiceError("Request timed out. Check your connection.")
+            raise TransientWeatherError("Request timed out. Check your connection.")
         except httpx.ConnectError:
-            raise WeatherServiceError("Connection error. Please check your internet.")
+            raise TransientWeatherError("Connection error. Please check your internet.")
         except httpx.NetworkError:
-            raise WeatherServiceError("Network error occurred.")
+            raise TransientWeatherError("Network error occurred.")
         except httpx.RequestError as e:
-            raise WeatherServiceError(f"Request error: {str(e)}")
+            raise TransientWeatherError(f"Request error: {str(e)}")
         except Exception as e:
             raise WeatherServiceError(f"Unexpected error: {str(e)}")
 
-    async def get_forecast(self, city: str) -> Dict:
-        """Get 5-day weather forecast."""
-        forecast_url = "https://api.openweathermap.org/data/2.5/forecast"
-        params = {
-            "q": city,
-            "appid": self.api_key,
-            "units": Config.UNITS,
-        }
-
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            response = await client.get(forecast_url, params=params)
-            response.raise_for_status()
-            return response.json()
\ No newline at end of file
+    @staticmethod
+    def _retry_after(response) -> Optional[float]:
+        """Seconds from a Retry-After header, if it holds a number."""
+        try:
+            return float(response.headers.get("Retry-After"))
+        except (TypeError, ValueError):
+            return None